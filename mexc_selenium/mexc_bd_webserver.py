@@ -1,44 +1,270 @@
-from flask import Flask, request, jsonify
-from mexc_browser_driver import MexcBrowserDriver,STR2DIRECTION
-
-driver=MexcBrowserDriver(cfg_file_name='cfg.json')
-driver.init_browser()
-
-app = Flask(__name__)
-
-@app.route('/place_limit_order', methods=['POST'])
-def place_limit_order():
-    data = request.json
-    direction = STR2DIRECTION[data['direction']]
-    price = float(data['price'])
-    quantity = float(data['quantity'])
-    
-    result = driver.place_limit_order(direction, price, quantity)
-    
-    return jsonify(result)
-
-@app.route('/place_stop_order', methods=['POST'])
-def place_stop_order():
-    data = request.json
-    direction = STR2DIRECTION[data['direction']]
-    trigger_price = float(data['trigger_price'])
-    quantity = float(data['quantity'])
-    take_profit_price = float(data['take_profit_price'])
-    stop_loss_price = float(data['stop_loss_price'])
-    
-    result = driver.place_stop_order(direction, trigger_price, quantity, take_profit_price, stop_loss_price)
-    
-    return jsonify(result)
-
-@app.route('/place_market_order', methods=['POST'])
-def place_market_order():
-    data = request.json
-    direction = STR2DIRECTION[data['direction']]
-    quantity = float(data['quantity'])
-    
-    result = driver.place_market_order(direction , quantity)
-    
-    return jsonify(result)
+import asyncio
+import json,time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web, WSMsgType
+from mexc_browser_driver import STR2DIRECTION, DEFAULT_SYMBOL
+from mexc_browser_pool import MexcBrowserPool, RESULT_UNKNOWN
+
+# 排队中的委托上限，超过后直接返回503
+QUEUE_SIZE = 100
+# 保留的已完成委托凭证数量
+TICKET_KEEP = 1000
+# 统计延时使用的最近委托数量
+LATENCY_SAMPLES = 1000
+
+
+def parse_limit_order(data: dict) -> tuple:
+    return (
+        STR2DIRECTION[data['direction']],
+        float(data['price']),
+        float(data['quantity']),
+        data.get('symbol', DEFAULT_SYMBOL)
+    )
+
+def parse_stop_order(data: dict) -> tuple:
+    return (
+        STR2DIRECTION[data['direction']],
+        float(data['trigger_price']),
+        float(data['quantity']),
+        float(data['take_profit_price']),
+        float(data['stop_loss_price']),
+        data.get('symbol', DEFAULT_SYMBOL)
+    )
+
+def parse_market_order(data: dict) -> tuple:
+    return (
+        STR2DIRECTION[data['direction']],
+        float(data['quantity']),
+        data.get('symbol', DEFAULT_SYMBOL)
+    )
+
+ORDER_PARSERS = {
+    'place_limit_order': parse_limit_order,
+    'place_stop_order': parse_stop_order,
+    'place_market_order': parse_market_order,
+}
+
+
+class Ticket:
+    # 一笔委托的凭证：排队->执行->完成，记录各阶段时间
+    def __init__(self, ticket_id: str, method: str, args: tuple):
+        self.ticket_id = ticket_id
+        self.method = method
+        self.args = args
+        self.status = 'queued'
+        self.result = None
+        self.future = asyncio.get_running_loop().create_future()
+        self.received_time = time.time()
+        self.started_time = 0
+        self.finished_time = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'ticket': self.ticket_id,
+            'method': self.method,
+            'status': self.status,
+            'result': self.result,
+        }
+
+
+class LatencyStat:
+    # 保存最近LATENCY_SAMPLES次的耗时(毫秒)
+    def __init__(self):
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds * 1000)
+
+    def to_dict(self) -> dict:
+        if not self.samples:
+            return {'count': 0}
+        values = sorted(self.samples)
+        return {
+            'count': len(values),
+            'avg': round(sum(values) / len(values), 1),
+            'p50': round(values[len(values) // 2], 1),
+            'p99': round(values[min(len(values) - 1, int(len(values) * 0.99))], 1),
+            'max': round(values[-1], 1),
+        }
+
+
+class MexcBridgeServer:
+    # asyncio下单服务：委托进入有界队列，由与浏览器数量相同的协程取出并在线程池中调用浏览器池
+    def __init__(self, pool: MexcBrowserPool):
+        self.pool = pool
+        self.queue : asyncio.Queue = None
+        self.tickets : OrderedDict = OrderedDict()
+        self.ticket_count = 0
+        self.executor = ThreadPoolExecutor(max_workers=len(pool.workers))
+        self.start_time = time.time()
+
+        self.counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'unknown': 0, 'rejected': 0}
+        self.latency = {
+            'queue': LatencyStat(),
+            'execute': LatencyStat(),
+            'total': LatencyStat(),
+        }
+
+        self.app = web.Application()
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_cleanup.append(self.on_cleanup)
+        for method in ORDER_PARSERS:
+            self.app.router.add_post(f'/{method}', self.handle_order)
+        self.app.router.add_get('/ticket/{ticket_id}', self.handle_ticket)
+        self.app.router.add_get('/health', self.handle_health)
+        self.app.router.add_get('/stats', self.handle_stats)
+        self.app.router.add_get('/ws', self.handle_ws)
+
+    async def on_startup(self, app: web.Application):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.worker_tasks = [asyncio.create_task(self.run_worker()) for _ in self.pool.workers]
+
+    async def on_cleanup(self, app: web.Application):
+        for task in self.worker_tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False)
+
+    def submit(self, method: str, data: dict) -> Ticket:
+        # 创建凭证并放入队列，队列已满时返回None
+        self.ticket_count += 1
+        ticket = Ticket(str(self.ticket_count), method, ORDER_PARSERS[method](data))
+        try:
+            self.queue.put_nowait(ticket)
+        except asyncio.QueueFull:
+            self.counts['rejected'] += 1
+            return None
+
+        self.counts['submitted'] += 1
+        self.tickets[ticket.ticket_id] = ticket
+        while len(self.tickets) > TICKET_KEEP:
+            self.tickets.popitem(last=False)
+        return ticket
+
+    async def run_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            ticket = await self.queue.get()
+            ticket.status = 'running'
+            ticket.started_time = time.time()
+            try:
+                ticket.result = await loop.run_in_executor(self.executor, self.pool.execute, ticket.method, *ticket.args)
+            except Exception as e:
+                print('下单出错', repr(e))
+                ticket.result = None
+            ticket.finished_time = time.time()
+
+            # failed：委托未提交；unknown：已点击下单但未拿到响应，需要调用方查询确认
+            if ticket.result is None:
+                ticket.status = 'failed'
+                self.counts['failed'] += 1
+            elif ticket.result == RESULT_UNKNOWN:
+                ticket.status = 'unknown'
+                self.counts['unknown'] += 1
+            else:
+                ticket.status = 'done'
+                self.counts['completed'] += 1
+            self.latency['queue'].add(ticket.started_time - ticket.received_time)
+            self.latency['execute'].add(ticket.finished_time - ticket.started_time)
+            self.latency['total'].add(ticket.finished_time - ticket.received_time)
+
+            # 等待结果的请求已断开时future可能已被取消
+            if not ticket.future.done():
+                ticket.future.set_result(ticket.result)
+            self.queue.task_done()
+
+    async def handle_order(self, request: web.Request):
+        # 默认等待下单完成，返回下单响应内容的JSON字符串，与原Flask接口一致
+        # 请求中带有"wait": false时立即返回凭证，之后通过/ticket/{id}查询
+        method = request.path.strip('/')
+        try:
+            data = await request.json()
+        except ValueError as e:
+            return web.json_response({'error': repr(e)}, status=400)
+        if not isinstance(data, dict):
+            return web.json_response({'error': 'invalid body'}, status=400)
+        try:
+            ticket = self.submit(method, data)
+        except (KeyError, ValueError) as e:
+            return web.json_response({'error': repr(e)}, status=400)
+        if not ticket:
+            return web.json_response({'error': 'queue full'}, status=503)
+
+        if not data.get('wait', True):
+            return web.json_response(ticket.to_dict(), status=202)
+
+        # 客户端断开时只取消本次等待，不影响凭证和其他等待者
+        result = await asyncio.shield(ticket.future)
+        return web.json_response(result)
+
+    async def handle_ticket(self, request: web.Request):
+        ticket = self.tickets.get(request.match_info['ticket_id'], None)
+        if not ticket:
+            return web.json_response({'error': 'ticket not found'}, status=404)
+        return web.json_response(ticket.to_dict())
+
+    async def handle_health(self, request: web.Request):
+        idle_count = self.pool.idle_workers.qsize()
+        return web.json_response({
+            'status': 'ok' if self.pool.active else 'stopped',
+            'workers': len(self.pool.workers),
+            'healthy_workers': sum(1 for worker in self.pool.workers if worker.healthy),
+            'idle_workers': idle_count,
+            'queue': self.queue.qsize(),
+        })
+
+    async def handle_stats(self, request: web.Request):
+        return web.json_response({
+            'uptime': round(time.time() - self.start_time),
+            'queue': self.queue.qsize(),
+            'queue_size': QUEUE_SIZE,
+            'running': sum(1 for ticket in self.tickets.values() if ticket.status == 'running'),
+            'counts': self.counts,
+            'latency_ms': {stage: stat.to_dict() for stage, stat in self.latency.items()},
+        })
+
+    async def handle_ws(self, request: web.Request):
+        # 消息格式：{"method": "place_limit_order", "id": 客户端编号, ...委托参数}
+        # 先回复凭证，下单完成后再推送结果
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                data = json.loads(msg.data)
+            except ValueError as e:
+                await ws.send_json({'error': repr(e)})
+                continue
+            if not isinstance(data, dict):
+                await ws.send_json({'error': 'invalid message'})
+                continue
+            method = data.get('method', '')
+            if method not in ORDER_PARSERS:
+                await ws.send_json({'id': data.get('id'), 'error': 'unknown method'})
+                continue
+            try:
+                ticket = self.submit(method, data)
+            except (KeyError, ValueError) as e:
+                await ws.send_json({'id': data.get('id'), 'error': repr(e)})
+                continue
+            if not ticket:
+                await ws.send_json({'id': data.get('id'), 'error': 'queue full'})
+                continue
+
+            await ws.send_json({'id': data.get('id'), **ticket.to_dict()})
+            asyncio.create_task(self.send_ws_result(ws, data.get('id'), ticket))
+        return ws
+
+    async def send_ws_result(self, ws: web.WebSocketResponse, client_id, ticket: Ticket):
+        await asyncio.shield(ticket.future)
+        if not ws.closed:
+            await ws.send_json({'id': client_id, **ticket.to_dict()})
+
 
 if __name__ == '__main__':
-    app.run(port=5102)
\ No newline at end of file
+    pool=MexcBrowserPool(cfg_file_name='cfg.json')
+    pool.start()
+    server=MexcBridgeServer(pool)
+    web.run_app(server.app, port=5102)
@@ -6,8 +6,11 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import ElementNotInteractableException, StaleElementReferenceException, TimeoutException
 import json,time
 from enum import Enum
+from collections import OrderedDict, deque
+from threading import Condition, Lock, Thread
 
 
 class Direction(Enum):
@@ -28,8 +31,121 @@ STR2DIRECTION = {
     "short" : Direction.SHORT
 }
 
+# 下单请求地址
+#{"success":true,"code":0,"data":{"orderId":"477474613211788800","ts":1699509218841}}
+#{"success":true,"code":0,"data":"477474127838541312"}
+ORDER_URL_MAP = {
+    OrderType.LIMIT: 'https://futures.mexc.com/api/v1/private/order/create',
+    OrderType.MARKET: 'https://futures.mexc.com/api/v1/private/order/create',
+    OrderType.STOP: 'https://futures.mexc.com/api/v1/private/planorder/place/v2',
+}
+# 交易页面
+TRADE_URL = 'https://futures.mexc.com/exchange/{symbol}?type=linear_swap'
+# 未指定合约时使用的合约
+DEFAULT_SYMBOL = 'ETH_USDT'
+# 每个浏览器最多保持打开的合约页面数量，超过后关闭最久未使用的页面
+MAX_TABS = 5
+# 合约页面超过该秒数未使用时关闭
+TAB_IDLE_SECONDS = 1800
+# 只记录私有接口的响应
+LISTEN_URL_PREFIX = 'https://futures.mexc.com/api/v1/private/'
+# 等待下单响应的最长秒数
+RESPONSE_TIMEOUT = 10
+# 有下单在等待响应时，后台线程读取performance日志的间隔秒数
+LISTEN_INTERVAL = 0.02
+# 没有等待中的下单时，只按该间隔读取日志，避免积压且不与页面操作争用chromedriver
+LISTEN_IDLE_INTERVAL = 1
+
+
+class MexcNetworkListener:
+    # 后台线程读取performance日志中的Network事件，只在有wait_response()等待时高频读取
+    # 下单前调用mark()读完积压的日志并记录位置，下单后wait_response()等待之后到达且已接收完毕的响应
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.condition = Condition()
+        self.poll_lock = Lock()
+        self.seq = 0
+        self.waiters = 0
+        self.responses = deque(maxlen=1000)   # (序号, requestId, url)
+        self.finished = deque(maxlen=1000)    # 已接收完毕的requestId
+        self.active = False
+        self.thread = None
+
+    def start(self):
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.active = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while self.active:
+            if self.poll():
+                continue
+            with self.condition:
+                self.condition.wait(LISTEN_INTERVAL if self.waiters else LISTEN_IDLE_INTERVAL)
+
+    def poll(self) -> bool:
+        # 读取并处理一次日志，返回是否读到日志
+        with self.poll_lock:
+            try:
+                logs = self.driver.get_log("performance")
+            except Exception:
+                logs = []
+            if logs:
+                self.process_logs(logs)
+        return bool(logs)
+
+    def process_logs(self, logs):
+        changed = False
+        with self.condition:
+            for item in logs:
+                log = json.loads(item["message"])["message"]
+                method = log["method"]
+                if method == 'Network.responseReceived':
+                    url = log['params']['response']['url']
+                    if not url.startswith(LISTEN_URL_PREFIX):
+                        continue
+                    self.seq += 1
+                    self.responses.append((self.seq, log['params']['requestId'], url))
+                    changed = True
+                elif method == 'Network.loadingFinished':
+                    self.finished.append(log['params']['requestId'])
+                    changed = True
+            if changed:
+                self.condition.notify_all()
+
+    def mark(self) -> int:
+        # 先读完积压的日志，之前的响应不会被当作本次下单的响应
+        while self.poll():
+            pass
+        with self.condition:
+            return self.seq
+
+    def wait_response(self, url_prefix: str, mark: int, timeout: float):
+        # 返回mark之后第一个匹配url_prefix且已接收完毕的requestId，超时返回None
+        def find_request():
+            for seq, request_id, url in self.responses:
+                if seq > mark and url_prefix in url and request_id in self.finished:
+                    return request_id
+            return None
+        with self.condition:
+            self.waiters += 1
+            self.condition.notify_all()
+            try:
+                self.condition.wait_for(find_request, timeout)
+                return find_request()
+            finally:
+                self.waiters -= 1
+
 class MexcBrowserDriver:
-    def __init__(self,cfg_file_name:str):
+    def __init__(self,cfg_file_name:str,user_data_dir:str=""):
         # 初始化函数，可以在这里进行一些初始化操作
         self.driver : webdriver.Chrome
         self.限价按钮=r'//*[@id="mexc_contract_v_open_way_position"]/div[1]/div/span[1]'
@@ -54,117 +170,226 @@ class MexcBrowserDriver:
         self.市价单按钮=r'//*[@id="mexc_contract_v_open_way_position"]/div[1]/div/span[2]'
         self.市价数量输入框=r'//*[@id="mexc_contract_v_open_way_position"]/div[4]/div[1]/div/div[2]/div/div/input'
 
+        self.listener : MexcNetworkListener = None
+        # 本次下单是否已点击开仓按钮，之后出错时委托可能已提交，结果未知
+        self.submitted = False
+        # 合约 -> [页面句柄, 最近使用时间]，按最近使用排序
+        self.tabs = OrderedDict()
+        # 页面句柄 -> 该页面的元素名称 -> WebElement缓存，元素失效或不可操作时重新查找
+        # 按名称而不是xpath缓存：限价价格、触发价格和市价数量输入框的xpath相同，切换下单方式后是不同的输入框
+        self.tab_elements = {}
+        self.elements = {}
+        self.current_symbol = ''
+        # 预先查找并缓存的常用元素名称
+        self.cached_names = [
+            '限价按钮',
+            '限价价格输入框',
+            '限价数量输入框',
+            '计划委托按钮',
+            '价格输入区域',
+            '数量输入框',
+            '做多止盈止损按钮',
+            '做空止盈止损按钮',
+            '开多按钮',
+            '开空按钮',
+            '市价单按钮',
+        ]
+
         with open(cfg_file_name,"r") as fp:
             self.cfg=json.load(fp)
+        # 浏览器池中每个浏览器使用独立的用户数据目录
+        self.user_data_dir = user_data_dir or self.cfg["user-data-dir"]
+        # 启动时预先打开的合约页面
+        self.symbols = self.cfg.get("symbols") or [DEFAULT_SYMBOL]
+        self.max_tabs = self.cfg.get("max-tabs", MAX_TABS)
 
     def init_browser(self):
         chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument(f'--user-data-dir={self.cfg["user-data-dir"]}')
+        chrome_options.add_argument(f'--user-data-dir={self.user_data_dir}')
         chrome_options.set_capability("goog:loggingPrefs", {'performance': 'ALL'})
         # 初始化webdriver
         self.driver = webdriver.Chrome(options=chrome_options,service=Service(ChromeDriverManager().install()))
+        self.listener = MexcNetworkListener(self.driver)
+        self.listener.start()
         # 调整浏览器窗口大小
         self.driver.set_window_size(800, 800)
+        # 第一个合约使用初始页面，其余合约各开一个标签页
+        for symbol in self.symbols[:self.max_tabs]:
+            self.open_tab(symbol, new_tab=bool(self.tabs))
+
+    def open_tab(self, symbol:str, new_tab:bool=True):
+        if new_tab:
+            self.driver.switch_to.new_window('tab')
         # 访问网站
-        self.driver.get('https://futures.mexc.com/exchange/ETH_USDT?type=linear_swap')
+        self.driver.get(TRADE_URL.format(symbol=symbol))
         # 等待检测到计划委托按钮出现
         wait = WebDriverWait(self.driver, 30)  # 等待最长30秒
         try:
             wait.until(EC.visibility_of_element_located((By.XPATH, self.计划委托按钮)))
-        except TimeoutError as e:
-            print('没检测到计划委托按钮')
-    def place_limit_order(self, direction:Direction , price:float, quantity:float ):
-        # 下限价单函数
-        # 参数：下单价格（price），下单数量（quantity），下单方向（direction）
-        # 在这里实现下限价单的逻辑
-        button_element = self.driver.find_element(By.XPATH, self.限价按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
+        except TimeoutException:
+            print('没检测到计划委托按钮', symbol)
+
+        handle = self.driver.current_window_handle
+        self.tabs[symbol] = [handle, time.time()]
+        self.elements = self.tab_elements.setdefault(handle, {})
+        self.current_symbol = symbol
+        self.warm_up()
+
+    def switch_symbol(self, symbol:str):
+        # 切换到合约对应的标签页，不重新加载页面；没有打开过的合约新开标签页
+        tab = self.tabs.get(symbol, None)
+        if tab:
+            tab[1] = time.time()
+            self.tabs.move_to_end(symbol)
+            if symbol != self.current_symbol:
+                self.driver.switch_to.window(tab[0])
+                self.elements = self.tab_elements[tab[0]]
+                self.current_symbol = symbol
+            return
+
+        while len(self.tabs) >= self.max_tabs:
+            self.close_tab(next(iter(self.tabs)))
+        self.open_tab(symbol, new_tab=bool(self.tabs))
+
+    def close_tab(self, symbol:str):
+        handle, _ = self.tabs.pop(symbol)
+        self.tab_elements.pop(handle, None)
+        self.driver.switch_to.window(handle)
+        if self.tabs:
+            self.driver.close()
+            symbol, (handle, _) = next(reversed(self.tabs.items()))
+            self.driver.switch_to.window(handle)
+            self.elements = self.tab_elements[handle]
+            self.current_symbol = symbol
+        else:
+            # 保留最后一个浏览器窗口，供打开新合约使用
+            self.current_symbol = ''
 
-        input_element = self.driver.find_element(By.XPATH, self.限价价格输入框)
-        self.clear_input_content(input_element)
-        input_element.send_keys(f'{price}')
+    def close_idle_tabs(self, idle_seconds:float=TAB_IDLE_SECONDS):
+        # 关闭长时间未使用的页面，至少保留一个
+        expire_time = time.time() - idle_seconds
+        for symbol, (handle, last_time) in list(self.tabs.items()):
+            if len(self.tabs) <= 1:
+                break
+            if last_time < expire_time:
+                self.close_tab(symbol)
 
+    def warm_up(self):
+        # 预先查找常用元素，第一笔委托不用再逐个查找
+        self.elements.clear()
+        for name in self.cached_names:
+            elements = self.driver.find_elements(By.XPATH, getattr(self, name))
+            if elements:
+                self.cache_element(name, elements[0])
 
-        input_element = self.driver.find_element(By.XPATH, self.限价数量输入框)
-        self.clear_input_content(input_element)
-        input_element.send_keys(f'{quantity}')
+    def cache_element(self, name:str, element):
+        self.elements[name] = element
+        return element
 
+    def find_element(self, name:str):
+        # 按名称对应的xpath重新查找元素并缓存
+        return self.cache_element(name, self.driver.find_element(By.XPATH, getattr(self, name)))
+
+    def find_cached_element(self, name:str):
+        element = self.elements.get(name, None)
+        if element is None:
+            return self.find_element(name)
+        return element
+
+    def run_with_element(self, name:str, func):
+        # 对缓存元素执行操作，元素已失效或被切换下单方式后隐藏时重新查找一次再执行
+        # 正常情况下直接使用缓存元素，不额外检查元素状态
+        try:
+            return func(self.find_cached_element(name))
+        except (StaleElementReferenceException, ElementNotInteractableException):
+            self.elements.pop(name, None)
+            return func(self.find_cached_element(name))
+
+    def click_element(self, name:str, scroll:bool=True):
+        def click(element):
+            if scroll:
+                self.driver.execute_script("arguments[0].scrollIntoView();", element)
+            ActionChains(self.driver).click(element).perform()
+        self.run_with_element(name, click)
+
+    def input_text(self, name:str, text:str):
+        # 清空输入框后输入内容，text为空时只清空
+        def fill(element):
+            self.clear_input_content(element)
+            if text:
+                element.send_keys(text)
+        self.run_with_element(name, fill)
+
+    def get_element_attribute(self, name:str, attribute:str):
+        return self.run_with_element(name, lambda element: element.get_attribute(attribute))
+    def place_limit_order(self, direction:Direction , price:float, quantity:float, symbol:str=DEFAULT_SYMBOL):
+        # 下限价单函数
+        # 参数：下单价格（price），下单数量（quantity），下单方向（direction），合约（symbol）
+        # 在这里实现下限价单的逻辑
+        self.submitted = False
+        self.switch_symbol(symbol)
+        mark = self.listener.mark()
+        self.click_element('限价按钮')
+        self.input_text('限价价格输入框', f'{price}')
+        self.input_text('限价数量输入框', f'{quantity}')
+
+        self.submitted = True
         if direction==Direction.LONG:
-            button_element = self.driver.find_element(By.XPATH, self.开多按钮)
+            self.click_element('开多按钮')
         else:
-            button_element = self.driver.find_element(By.XPATH, self.开空按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
+            self.click_element('开空按钮')
 
         dlg_title=None
         try:
+            # 等到的元素即为弹窗标题，不用再查找一次
             if direction==Direction.LONG:
-                is_present = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定买入做多)))
-                dlg_title = self.driver.find_element(By.XPATH, self.确定买入做多)
+                dlg_title = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定买入做多)))
             else:
-                is_present = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定卖出做空)))
-                dlg_title = self.driver.find_element(By.XPATH, self.确定卖出做空)
+                dlg_title = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定卖出做空)))
         except Exception:
-            is_present = None
-        if is_present and dlg_title:
-            self.driver.get_log("performance")
+            dlg_title = None
+        if dlg_title:
             button_element=dlg_title.find_element(By.XPATH, "../../div[3]/div[1]/div[1]/button[2]")
             ActionChains(self.driver).click(button_element).perform()
 
-        msg=self.get_response(OrderType.LIMIT)
+        msg=self.get_response(OrderType.LIMIT, mark)
         return msg
 
-    def place_stop_order(self, direction:Direction, trigger_price:float, quantity:float, take_profit_price:float, stop_loss_price:float):
+    def place_stop_order(self, direction:Direction, trigger_price:float, quantity:float, take_profit_price:float, stop_loss_price:float, symbol:str=DEFAULT_SYMBOL):
         # 下计划委托函数
-        # 参数：触发价格（trigger_price），止盈价格（take_profit_price），止损价格（stop_loss_price），下单方向（direction）
+        # 参数：触发价格（trigger_price），止盈价格（take_profit_price），止损价格（stop_loss_price），下单方向（direction），合约（symbol）
         # 在这里实现下计划委托的逻辑
         # 填写特定xpath的输入框
-        button_element = self.driver.find_element(By.XPATH, self.计划委托按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
-
-        input_element = self.driver.find_element(By.XPATH, self.触发价格输入框)
-        self.clear_input_content(input_element)
-        input_element.send_keys(f'{trigger_price}')
+        self.submitted = False
+        self.switch_symbol(symbol)
+        mark = self.listener.mark()
+        self.click_element('计划委托按钮')
+        self.input_text('触发价格输入框', f'{trigger_price}')
 
-        element = self.driver.find_element(By.XPATH, self.价格输入区域)
         # 检查元素的class属性
-        class_name = element.get_attribute('class')
+        class_name = self.get_element_attribute('价格输入区域', 'class')
         # 如果class的值是"pages-contract-handle-component-index-marketInputV"，则点击另一个元素
         if class_name == 'pages-contract-handle-component-index-numberInput':
-            button_element = self.driver.find_element(By.XPATH, self.市价按钮)
-            ActionChains(self.driver).click(button_element).perform()
+            self.click_element('市价按钮', scroll=False)
 
-        input_element = self.driver.find_element(By.XPATH, self.数量输入框)
-        self.clear_input_content(input_element)
-        input_element.send_keys(f'{quantity}')
+        self.input_text('数量输入框', f'{quantity}')
 
         if direction==Direction.LONG:
-            button_element = self.driver.find_element(By.XPATH, self.做多止盈止损按钮)
+            tpsl_name = '做多止盈止损按钮'
         else:
-            button_element = self.driver.find_element(By.XPATH, self.做空止盈止损按钮)
-        class_name = button_element.get_attribute('class')
+            tpsl_name = '做空止盈止损按钮'
+        class_name = self.get_element_attribute(tpsl_name, 'class')
         if class_name == 'components-checkbox-index-wrapper check-box-wrapper':
-            self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-            ActionChains(self.driver).click(button_element).perform()
-
-        input_element = self.driver.find_element(By.XPATH, self.止盈输入框)
-        self.clear_input_content(input_element)
-        if take_profit_price!=-1:
-            input_element.send_keys(f'{take_profit_price}')
+            self.click_element(tpsl_name)
 
-        input_element = self.driver.find_element(By.XPATH, self.止损输入框)
-        self.clear_input_content(input_element)
-        if stop_loss_price!=-1:
-            input_element.send_keys(f'{stop_loss_price}')
+        self.input_text('止盈输入框', f'{take_profit_price}' if take_profit_price!=-1 else '')
+        self.input_text('止损输入框', f'{stop_loss_price}' if stop_loss_price!=-1 else '')
 
+        self.submitted = True
         if direction==Direction.LONG:
-            button_element = self.driver.find_element(By.XPATH, self.开多按钮)
+            self.click_element('开多按钮')
         else:
-            button_element = self.driver.find_element(By.XPATH, self.开空按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
+            self.click_element('开空按钮')
 
         dlg_titles=None
 
@@ -172,51 +397,45 @@ class MexcBrowserDriver:
         #is_present = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.风险提示框)))
         dlg_titles = self.driver.find_elements(By.XPATH, self.风险提示框)
         if dlg_titles:
-            self.driver.get_log("performance")
             for dlg_title in dlg_titles:
                 if dlg_title.is_displayed() == True:
                     button_element=dlg_title.find_element(By.XPATH, "../../div[3]/div[1]/button[2]")
                     time.sleep(0.5)
                     ActionChains(self.driver).click(button_element).perform()
 
-        msg=self.get_response(OrderType.STOP)
+        msg=self.get_response(OrderType.STOP, mark)
         return msg
     
-    def place_market_order(self, direction:Direction , quantity:float ):
+    def place_market_order(self, direction:Direction , quantity:float, symbol:str=DEFAULT_SYMBOL):
         # 下市价单函数
-        # 参数：下单数量（quantity），下单方向（direction）
+        # 参数：下单数量（quantity），下单方向（direction），合约（symbol）
         # 在这里实现下市价单的逻辑
-        button_element = self.driver.find_element(By.XPATH, self.市价单按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
-
-        input_element = self.driver.find_element(By.XPATH, self.市价数量输入框)
-        self.clear_input_content(input_element)
-        input_element.send_keys(f'{quantity}')
+        self.submitted = False
+        self.switch_symbol(symbol)
+        mark = self.listener.mark()
+        self.click_element('市价单按钮')
+        self.input_text('市价数量输入框', f'{quantity}')
 
+        self.submitted = True
         if direction==Direction.LONG:
-            button_element = self.driver.find_element(By.XPATH, self.开多按钮)
+            self.click_element('开多按钮')
         else:
-            button_element = self.driver.find_element(By.XPATH, self.开空按钮)
-        self.driver.execute_script("arguments[0].scrollIntoView();", button_element)
-        ActionChains(self.driver).click(button_element).perform()
+            self.click_element('开空按钮')
 
         dlg_title=None
         try:
+            # 等到的元素即为弹窗标题，不用再查找一次
             if direction==Direction.LONG:
-                is_present = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定买入做多)))
-                dlg_title = self.driver.find_element(By.XPATH, self.确定买入做多)
+                dlg_title = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定买入做多)))
             else:
-                is_present = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定卖出做空)))
-                dlg_title = self.driver.find_element(By.XPATH, self.确定卖出做空)
+                dlg_title = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, self.确定卖出做空)))
         except Exception:
-            is_present = None
-        if is_present and dlg_title:
-            self.driver.get_log("performance")
+            dlg_title = None
+        if dlg_title:
             button_element=dlg_title.find_element(By.XPATH, "../../div[3]/div[1]/div[1]/button[2]")
             ActionChains(self.driver).click(button_element).perform()
 
-        msg=self.get_response(OrderType.MARKET)
+        msg=self.get_response(OrderType.MARKET, mark)
         return msg
     
     def clear_input_content(self,input_element):
@@ -225,26 +444,28 @@ class MexcBrowserDriver:
         # 使用Delete键删除选中的内容
         input_element.send_keys(Keys.DELETE)
 
-    def get_response(self,order_type:OrderType):
-        time.sleep(3)
-        logs = self.driver.get_log("performance")
-        for item in logs:
-            log = json.loads(item["message"])["message"]
-            if log["method"] == 'Network.responseReceived':
-                url = log['params']['response']['url']
-                if url == 'data:,':  # 过滤掉初始data页面，后续可以根据 log['params']['response']['type']过滤请求类型
-                    continue
-                #response_time = log['params']['response']['responseTime']
-                if order_type==OrderType.LIMIT:
-                    urlpfx='https://futures.mexc.com/api/v1/private/order/create'
-                    #{"success":true,"code":0,"data":{"orderId":"477474613211788800","ts":1699509218841}}
-                elif order_type==OrderType.MARKET:
-                    urlpfx='https://futures.mexc.com/api/v1/private/order/create'
-                else:
-                    urlpfx='https://futures.mexc.com/api/v1/private/planorder/place/v2'
-                    #{"success":true,"code":0,"data":"477474127838541312"}
-                if urlpfx in url:
-                    print('请求', url)
-                    request_id = log['params']['requestId']
-                    response_body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})['body']
-                    return response_body
\ No newline at end of file
+    def get_response(self,order_type:OrderType,mark:int,timeout:float=RESPONSE_TIMEOUT):
+        # 等待下单请求的响应到达后立即返回响应内容，超时返回None(已点击下单，结果未知)
+        urlpfx = ORDER_URL_MAP[order_type]
+        request_id = self.listener.wait_response(urlpfx, mark, timeout)
+        if not request_id:
+            print('等待下单响应超时', urlpfx)
+            return None
+        response_body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})['body']
+        return response_body
+
+    def is_alive(self) -> bool:
+        # 浏览器和页面是否仍可用
+        try:
+            return self.driver.execute_script("return document.readyState") == "complete"
+        except Exception:
+            return False
+
+    def quit(self):
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
\ No newline at end of file
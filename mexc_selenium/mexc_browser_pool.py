@@ -0,0 +1,146 @@
+from queue import Queue, Empty
+from threading import Thread
+import json,time
+from mexc_browser_driver import MexcBrowserDriver, DEFAULT_SYMBOL
+
+# 等待空闲浏览器的最长秒数
+ACQUIRE_TIMEOUT = 30
+# 空闲浏览器健康检查间隔秒数
+HEALTH_CHECK_INTERVAL = 10
+# 已点击下单后出错或等待响应超时时返回的结果，委托可能已提交，由调用方查询确认
+RESULT_UNKNOWN = json.dumps({'success': False, 'unknown': True, 'message': 'order result unknown'})
+
+
+class MexcBrowserWorker:
+    # 浏览器池中的一个浏览器，使用独立的用户数据目录
+    def __init__(self, index: int, cfg_file_name: str, user_data_dir: str):
+        self.index = index
+        self.cfg_file_name = cfg_file_name
+        self.user_data_dir = user_data_dir
+        self.driver : MexcBrowserDriver = None
+        # 启动成功且未出错，只有健康的浏览器会放入空闲队列
+        self.healthy = False
+
+    def start(self):
+        self.driver = MexcBrowserDriver(cfg_file_name=self.cfg_file_name, user_data_dir=self.user_data_dir)
+        self.driver.init_browser()
+        self.healthy = True
+
+    def restart(self):
+        print(f'重启浏览器{self.index}', self.user_data_dir)
+        self.healthy = False
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+        self.start()
+
+    def is_alive(self) -> bool:
+        return bool(self.driver) and self.driver.is_alive()
+
+
+class MexcBrowserPool:
+    # 多个浏览器组成的下单池
+    # 每笔委托从空闲队列取出一个浏览器执行，执行完放回
+    # 下单出错或健康检查失败的浏览器标记为不健康，不再放回空闲队列，由健康检查线程重启后再放回
+    def __init__(self, cfg_file_name: str):
+        with open(cfg_file_name,"r") as fp:
+            cfg=json.load(fp)
+        user_data_dirs = cfg.get("user-data-dirs") or [cfg["user-data-dir"]]
+
+        self.workers = [
+            MexcBrowserWorker(index, cfg_file_name, user_data_dir)
+            for index, user_data_dir in enumerate(user_data_dirs)
+        ]
+        self.idle_workers : Queue = Queue()
+        self.active = False
+        self.health_thread : Thread = None
+
+    def start(self):
+        # 并行启动全部浏览器
+        threads = [Thread(target=self.start_worker, args=(worker,)) for worker in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for worker in self.workers:
+            if worker.healthy:
+                self.idle_workers.put(worker)
+
+        self.active = True
+        self.health_thread = Thread(target=self.run_health_check, daemon=True)
+        self.health_thread.start()
+
+    def stop(self):
+        self.active = False
+        for worker in self.workers:
+            if worker.driver:
+                worker.driver.quit()
+
+    def start_worker(self, worker: MexcBrowserWorker):
+        try:
+            worker.start()
+        except Exception as e:
+            print(f'浏览器{worker.index}启动失败', repr(e))
+
+    def restart_worker(self, worker: MexcBrowserWorker):
+        try:
+            worker.restart()
+        except Exception as e:
+            print(f'浏览器{worker.index}重启失败', repr(e))
+        if worker.healthy:
+            self.idle_workers.put(worker)
+
+    def close_idle_tabs(self, worker: MexcBrowserWorker):
+        try:
+            worker.driver.close_idle_tabs()
+        except Exception as e:
+            print(f'浏览器{worker.index}关闭页面出错', repr(e))
+
+    def execute(self, method_name: str, *args):
+        # 在空闲浏览器上执行下单函数，返回下单响应内容
+        # 点击下单前出错返回None，委托未提交；点击下单后出错或等待响应超时返回RESULT_UNKNOWN
+        # 出错的浏览器标记为不健康，由健康检查线程重启，不占用下单线程
+        worker = self.idle_workers.get(timeout=ACQUIRE_TIMEOUT)
+        try:
+            result = getattr(worker.driver, method_name)(*args)
+        except Exception as e:
+            print(f'浏览器{worker.index}下单出错', repr(e))
+            worker.healthy = False
+            return RESULT_UNKNOWN if worker.driver.submitted else None
+        finally:
+            if worker.healthy:
+                self.idle_workers.put(worker)
+
+        if result is None:
+            print(f'浏览器{worker.index}下单结果未知')
+            return RESULT_UNKNOWN
+        return result
+
+    def run_health_check(self):
+        # 依次检查空闲的浏览器，正在下单的浏览器不受影响，再重启全部不健康的浏览器
+        while self.active:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            for _ in range(len(self.workers)):
+                try:
+                    worker = self.idle_workers.get_nowait()
+                except Empty:
+                    break
+                if not worker.is_alive():
+                    worker.healthy = False
+                    continue
+                self.close_idle_tabs(worker)
+                self.idle_workers.put(worker)
+
+            for worker in self.workers:
+                if self.active and not worker.healthy:
+                    self.restart_worker(worker)
+
+    def place_limit_order(self, direction, price, quantity, symbol=DEFAULT_SYMBOL):
+        return self.execute("place_limit_order", direction, price, quantity, symbol)
+
+    def place_stop_order(self, direction, trigger_price, quantity, take_profit_price, stop_loss_price, symbol=DEFAULT_SYMBOL):
+        return self.execute("place_stop_order", direction, trigger_price, quantity, take_profit_price, stop_loss_price, symbol)
+
+    def place_market_order(self, direction, quantity, symbol=DEFAULT_SYMBOL):
+        return self.execute("place_market_order", direction, quantity, symbol)
@@ -4,30 +4,33 @@ class MexcOrderPlacer:
     def __init__(self,rest_host:str):
         self.rest_host = rest_host
 
-    def place_limit_order(self,direction, price, quantity):
+    def place_limit_order(self,direction, price, quantity, symbol='ETH_USDT'):
         data = {
             'direction': direction,
             'price': price,
-            'quantity': quantity
+            'quantity': quantity,
+            'symbol': symbol
         }
         response = requests.post(f'{self.rest_host}/place_limit_order', json=data)
         print(response.json())
 
-    def place_stop_order(self,direction, trigger_price, quantity, take_profit_price, stop_loss_price):
+    def place_stop_order(self,direction, trigger_price, quantity, take_profit_price, stop_loss_price, symbol='ETH_USDT'):
         data = {
             'direction': direction,
             'trigger_price': trigger_price,
             'quantity': quantity,
             'take_profit_price': take_profit_price,
-            'stop_loss_price': stop_loss_price
+            'stop_loss_price': stop_loss_price,
+            'symbol': symbol
         }
         response = requests.post(f'{self.rest_host}/place_stop_order', json=data)
         print(response.json())
 
-    def place_market_order(self,direction , quantity):
+    def place_market_order(self,direction , quantity, symbol='ETH_USDT'):
         data = {
             'direction': direction,
-            'quantity': quantity
+            'quantity': quantity,
+            'symbol': symbol
         }
         response = requests.post(f'{self.rest_host}/place_market_order', json=data)
         print(response.json())
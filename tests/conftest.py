@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vnpy.event import EventEngine
+from vnpy.trader.constant import Direction, Exchange, Offset, OrderType, Status
+from vnpy.trader.event import EVENT_ORDER, EVENT_TRADE
+from vnpy.trader.object import OrderData
+
+from vnpy_mexc.mexc_gateway import MexcGateway
+
+
+class EventRecorder:
+    """
+    记录网关推送的事件，不启动事件引擎
+    """
+    def __init__(self):
+        self.events: List[tuple] = []
+
+    def on_event(self, type: str, data=None) -> None:
+        self.events.append((type, data))
+
+    def get(self, type: str) -> list:
+        return [data for event_type, data in self.events if event_type == type]
+
+    @property
+    def orders(self) -> List[OrderData]:
+        return self.get(EVENT_ORDER)
+
+    @property
+    def trades(self) -> list:
+        return self.get(EVENT_TRADE)
+
+
+@pytest.fixture
+def recorder() -> EventRecorder:
+    return EventRecorder()
+
+
+@pytest.fixture
+def gateway(recorder: EventRecorder) -> MexcGateway:
+    gateway = MexcGateway(EventEngine(), "MEXC")
+    gateway.on_event = recorder.on_event
+    gateway.write_log = lambda msg: None
+    yield gateway
+    gateway.rest_api.bridge_executor.shutdown(wait=True)
+
+
+def make_order(
+    orderid: str,
+    status: Status = Status.NOTTRADED,
+    traded: float = 0,
+    volume: float = 1,
+    price: float = 100,
+    type: OrderType = OrderType.LIMIT,
+    offset: Offset = Offset.NONE
+) -> OrderData:
+    return OrderData(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        orderid=orderid,
+        type=type,
+        direction=Direction.LONG,
+        offset=offset,
+        price=price,
+        volume=volume,
+        traded=traded,
+        status=status,
+        gateway_name="MEXC",
+    )
@@ -0,0 +1,67 @@
+from vnpy.trader.constant import Status
+
+from vnpy_mexc.mexc_gateway import MexcGateway, MexcPageQuery
+
+from test_orderid_mapping import send_order
+
+
+def make_order_data(orderid: str, create_time: int, price: float = 100) -> dict:
+    return {
+        "orderId": orderid,
+        "symbol": "BTC_USDT",
+        "price": price,
+        "vol": 1,
+        "orderType": 1,
+        "side": 1,
+        "dealVol": 0,
+        "state": 2,
+        "createTime": create_time,
+    }
+
+
+def send_unknown_order(gateway: MexcGateway, monkeypatch) -> tuple:
+    queries = []
+
+    def start(self):
+        queries.append(self)
+
+    monkeypatch.setattr(MexcPageQuery, "start", start)
+    gateway.rest_api.post_bridge_order = lambda req: (None, True)
+    gateway.rest_api.cancel_all = lambda: None
+
+    orderid = send_order(gateway)
+    return orderid, queries[0]
+
+
+def test_unknown_result_keeps_order_submitting(gateway: MexcGateway, monkeypatch):
+    orderid, query = send_unknown_order(gateway, monkeypatch)
+
+    assert gateway.get_order(orderid).status == Status.SUBMITTING
+    assert gateway.rest_api.submitting_count == 1
+    assert query.path == "/api/v1/private/order/list/history_orders"
+    assert query.params["symbol"] == "BTC_USDT"
+
+
+def test_unknown_result_maps_earliest_matching_order(gateway: MexcGateway, monkeypatch):
+    orderid, query = send_unknown_order(gateway, monkeypatch)
+    gateway.map_orderid("other", "S0")
+
+    query.callback([
+        make_order_data("S3", 3),
+        make_order_data("S0", 1),
+        make_order_data("S1", 2, price=101),
+        make_order_data("S2", 2),
+    ])
+
+    assert gateway.get_sys_orderid(orderid) == "S2"
+    assert gateway.get_order(orderid).status == Status.NOTTRADED
+    assert gateway.rest_api.submitting_count == 0
+
+
+def test_unknown_result_without_match_is_rejected(gateway: MexcGateway, monkeypatch):
+    orderid, query = send_unknown_order(gateway, monkeypatch)
+
+    query.callback([make_order_data("S1", 2, price=101)])
+
+    assert gateway.get_order(orderid).status == Status.REJECTED
+    assert gateway.rest_api.submitting_count == 0
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from time import sleep
+
+from vnpy.trader.constant import OrderType, Status
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcCancelBatcher, MexcGateway
+
+from conftest import make_order
+
+
+class RecordingRestApi:
+    """
+    记录批量撤单请求，不发送
+    """
+    def __init__(self):
+        self.batches: list = []
+
+    def send_cancel_batch(self, orders: list, sys_orderids: list, plan: bool) -> None:
+        self.batches.append((sys_orderids, plan))
+
+
+def test_orders_are_flushed_after_window():
+    rest_api = RecordingRestApi()
+    batcher = MexcCancelBatcher(rest_api)
+
+    batcher.add(make_order("1"), "S1")
+    batcher.add(make_order("2", type=OrderType.STOP), "P2")
+    batcher.add(make_order("3"), "S3")
+    assert rest_api.batches == []
+
+    sleep(mexc_gateway.CANCEL_BATCH_WINDOW * 20)
+    assert rest_api.batches == [(["S1", "S3"], False), (["P2"], True)]
+    assert batcher.timer is None
+
+
+def test_full_batch_is_flushed_immediately(monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "CANCEL_BATCH_SIZE", 2)
+    rest_api = RecordingRestApi()
+    batcher = MexcCancelBatcher(rest_api)
+
+    batcher.add(make_order("1"), "S1")
+    batcher.add(make_order("2"), "S2")
+
+    assert rest_api.batches == [(["S1", "S2"], False)]
+    assert batcher.timer is None
+
+
+def make_cancel_request(gateway: MexcGateway) -> SimpleNamespace:
+    orders = {"11": make_order("1"), "12": make_order("2")}
+    for sys_orderid, order in orders.items():
+        gateway.on_order(order)
+        gateway.map_orderid(order.orderid, sys_orderid)
+    return SimpleNamespace(extra=orders, response=SimpleNamespace(text=""))
+
+
+def test_cancel_error_is_pushed_only_for_failed_order(gateway: MexcGateway, recorder):
+    request = make_cancel_request(gateway)
+    data = {
+        "success": True,
+        "code": 0,
+        "data": [
+            {"orderId": 11, "errorCode": 0},
+            {"orderId": 12, "errorCode": 2041, "errorMsg": "order not exist"},
+        ],
+    }
+    count = len(recorder.orders)
+
+    gateway.rest_api.on_cancel_orders(data, request)
+
+    orders = recorder.orders[count:]
+    assert [order.orderid for order in orders] == ["2"]
+    assert orders[0].status == Status.NOTTRADED
+    assert orders[0].extra == {"cancel_error_code": 2041, "cancel_error_msg": "order not exist"}
+
+
+def test_failed_cancel_batch_keeps_status_and_requeries(gateway: MexcGateway, recorder):
+    request = make_cancel_request(gateway)
+    queried = []
+    gateway.rest_api.query_order_detail = queried.append
+    count = len(recorder.orders)
+
+    gateway.rest_api.on_cancel_orders_failed(429, request)
+
+    assert recorder.orders[count:] == []
+    assert gateway.get_order("1").status == Status.NOTTRADED
+    assert queried == ["1", "2"]
@@ -0,0 +1,137 @@
+from datetime import datetime
+from pathlib import Path
+
+from vnpy.trader.constant import Direction, Exchange, Status
+from vnpy.trader.object import PositionData, TradeData
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcEventJournal, MexcGateway
+
+from conftest import make_order
+
+
+def make_trade(orderid: str, tradeid: str, volume: float = 1, price: float = 100) -> TradeData:
+    return TradeData(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        orderid=orderid,
+        tradeid=tradeid,
+        direction=Direction.LONG,
+        price=price,
+        volume=volume,
+        datetime=datetime(2026, 1, 1, 9, 30),
+        gateway_name="MEXC",
+    )
+
+
+def make_position(volume: float) -> PositionData:
+    return PositionData(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        direction=Direction.LONG,
+        volume=volume,
+        price=100,
+        gateway_name="MEXC",
+    )
+
+
+def reopen(journal: MexcEventJournal, folder: Path) -> list:
+    journal.close()
+    return MexcEventJournal("MEXC").open(folder)
+
+
+def test_records_round_trip(tmp_path: Path):
+    journal = MexcEventJournal("MEXC")
+    assert journal.open(tmp_path) == []
+
+    journal.append("map", ("1", "S1"))
+    journal.append("order", make_order("1", status=Status.PARTTRADED, traded=1, volume=2))
+    journal.append("trade", make_trade("1", "S1-1.0"))
+    journal.append("position", make_position(1))
+    records = reopen(journal, tmp_path)
+
+    assert [kind for kind, _ in records] == ["map", "order", "trade", "position"]
+    assert records[0][1] == ("1", "S1")
+    order = records[1][1]
+    assert order.status == Status.PARTTRADED
+    assert order.traded == 1
+    trade = records[2][1]
+    assert trade.tradeid == "S1-1.0"
+    assert trade.datetime == datetime(2026, 1, 1, 9, 30)
+    assert records[3][1].direction == Direction.LONG
+
+
+def test_compaction_keeps_latest_active_state(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "JOURNAL_KEEP_SECONDS", -1)
+    journal = MexcEventJournal("MEXC")
+    journal.open(tmp_path)
+
+    journal.append("map", ("1", "S1"))
+    journal.append("order", make_order("1"))
+    journal.append("order", make_order("1", status=Status.PARTTRADED, traded=1, volume=2))
+    journal.append("map", ("2", "S2"))
+    journal.append("order", make_order("2", status=Status.ALLTRADED, traded=1))
+    journal.append("trade", make_trade("2", "S2-1.0"))
+    journal.append("position", make_position(0))
+    records = reopen(journal, tmp_path)
+
+    assert [(kind, getattr(data, "orderid", data)) for kind, data in records] == [
+        ("map", ("1", "S1")),
+        ("order", "1"),
+    ]
+    assert records[1][1].status == Status.PARTTRADED
+
+
+def test_truncated_last_line_is_skipped(tmp_path: Path):
+    journal = MexcEventJournal("MEXC")
+    journal.open(tmp_path)
+    journal.append("order", make_order("1"))
+    journal.close()
+    with open(journal.file_path, "ab") as f:
+        f.write(b'["order",1700000000.0,"BTC')
+
+    records = MexcEventJournal("MEXC").open(tmp_path)
+
+    assert [kind for kind, _ in records] == ["order"]
+
+
+def test_background_compaction_keeps_newer_records(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "JOURNAL_COMPACT_SIZE", 3)
+    journal = MexcEventJournal("MEXC")
+    journal.open(tmp_path)
+
+    for traded in range(5):
+        journal.append("order", make_order("1", status=Status.PARTTRADED, traded=traded, volume=10))
+    journal.join_compact()
+    journal.append("order", make_order("1", status=Status.PARTTRADED, traded=5, volume=10))
+    journal.close()
+
+    with open(journal.file_path, "rb") as f:
+        assert len(f.readlines()) < 6
+    records = MexcEventJournal("MEXC").open(tmp_path)
+    assert [data.traded for _, data in records] == [5]
+
+
+def test_replay_restores_state_and_resolves_submitting_orders(gateway: MexcGateway):
+    records = [
+        ("map", ("1", "S1")),
+        ("order", make_order("1", status=Status.PARTTRADED, traded=1, volume=2)),
+        ("trade", make_trade("1", "S1-1.0")),
+        ("map", ("2", "S2")),
+        ("order", make_order("2", status=Status.SUBMITTING)),
+        ("order", make_order("3", status=Status.SUBMITTING)),
+        ("position", make_position(1)),
+    ]
+
+    gateway.replay_journal(records)
+
+    assert gateway.get_sys_orderid("1") == "S1"
+    assert gateway.get_local_orderid("S1") == "1"
+    assert gateway.get_order("1").status == Status.PARTTRADED
+    assert gateway.get_order("2").status == Status.NOTTRADED
+    assert gateway.get_order("3").status == Status.REJECTED
+    assert gateway.positions[make_position(1).vt_positionid].volume == 1
+
+    fill_tracker = gateway.trade_ws_api.fill_tracker
+    assert fill_tracker.update("S1", 1, 100) is None
+    assert fill_tracker.update("S1", 2, 100) == (1, 100)
@@ -0,0 +1,72 @@
+import pytest
+
+from vnpy.trader.constant import Exchange, Product
+from vnpy.trader.object import ContractData
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcFillTracker, MexcGateway
+
+from conftest import make_order
+
+
+def test_update_returns_delta_volume_and_price():
+    tracker = MexcFillTracker()
+
+    assert tracker.update("S1", 1, 100) == (1, 100)
+    volume, price = tracker.update("S1", 3, 102)
+    assert volume == 2
+    assert price == pytest.approx(103)
+
+
+def test_repeated_or_older_update_is_ignored():
+    tracker = MexcFillTracker()
+    tracker.update("S1", 2, 100)
+
+    assert tracker.update("S1", 2, 100) is None
+    assert tracker.update("S1", 1, 100) is None
+
+
+def test_sub_lot_delta_is_carried_to_next_update():
+    tracker = MexcFillTracker()
+
+    assert tracker.update("S1", 0.4, 100, 1) is None
+    volume, price = tracker.update("S1", 1, 100, 1)
+    assert volume == 1
+    assert price == pytest.approx(100)
+
+
+def test_seed_suppresses_known_fills():
+    tracker = MexcFillTracker()
+    tracker.seed("S1", 2, 100)
+
+    assert tracker.update("S1", 2, 100) is None
+    assert tracker.update("S1", 3, 100) == (1, 100)
+
+
+def test_tracker_is_bounded():
+    tracker = MexcFillTracker(size=2)
+    for sys_orderid in ("S1", "S2", "S3"):
+        tracker.update(sys_orderid, 1, 100)
+
+    assert list(tracker.fills) == ["S2", "S3"]
+
+
+def test_trade_id_keeps_full_precision(gateway: MexcGateway, recorder, monkeypatch):
+    contract = ContractData(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        name="BTC_USDT",
+        product=Product.FUTURES,
+        size=1,
+        pricetick=0.1,
+        min_volume=0.5,
+        gateway_name="MEXC",
+    )
+    monkeypatch.setitem(mexc_gateway.symbol_contract_map, "BTC_USDT", contract)
+    order = make_order("1", volume=2000000)
+
+    gateway.trade_ws_api.update_fill(order, "S1", 1234567.5, 100, 1700000000000)
+    gateway.trade_ws_api.update_fill(order, "S1", 1234568.0, 100, 1700000000000)
+
+    assert [trade.tradeid for trade in recorder.trades] == ["S1-1234567.5", "S1-1234568.0"]
+    assert [trade.volume for trade in recorder.trades] == [1234567.5, 0.5]
@@ -0,0 +1,118 @@
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import HistoryRequest
+
+from vnpy_mexc.mexc_gateway import MexcBarFrame, MexcGateway, MexcKlineCache
+
+
+START = 1700000040
+END = START + 600
+
+
+def make_request(start: int = START, end: int = END) -> HistoryRequest:
+    return HistoryRequest(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        start=datetime.fromtimestamp(start),
+        end=datetime.fromtimestamp(end),
+        interval=Interval.MINUTE,
+    )
+
+
+def make_frame(req: HistoryRequest, start: int, end: int) -> MexcBarFrame:
+    times = list(range(start, end + 1, 60))
+    return MexcBarFrame.from_kline_data(req, "MEXC", {
+        "time": times,
+        "open": [float(t) for t in times],
+        "high": [float(t) for t in times],
+        "low": [float(t) for t in times],
+        "close": [float(t) for t in times],
+        "vol": [1.0] * len(times),
+    })
+
+
+def stub_download(gateway: MexcGateway, success: bool = True) -> list:
+    calls = []
+
+    def query_history_range(req, start_time, end_time):
+        calls.append((start_time, end_time))
+        return make_frame(req, start_time, end_time), success
+
+    gateway.rest_api.query_history_range = query_history_range
+    return calls
+
+
+def test_save_and_load_round_trip(tmp_path: Path):
+    cache = MexcKlineCache(tmp_path)
+    req = make_request()
+    frame = make_frame(req, START, END)
+
+    cache.save(frame, START, END)
+    loaded, cache_start, cache_end = cache.load(req, "MEXC")
+
+    assert (cache_start, cache_end) == (START, END)
+    assert np.array_equal(loaded.timestamps, frame.timestamps)
+    assert np.array_equal(loaded.close_price, frame.close_price)
+
+
+def test_load_missing_cache(tmp_path: Path):
+    loaded, cache_start, cache_end = MexcKlineCache(tmp_path).load(make_request(), "MEXC")
+
+    assert not len(loaded)
+    assert (cache_start, cache_end) == (0, 0)
+
+
+def test_second_query_only_downloads_last_bar(gateway: MexcGateway, tmp_path: Path):
+    gateway.rest_api.kline_cache = MexcKlineCache(tmp_path)
+    calls = stub_download(gateway)
+
+    frame = gateway.rest_api.query_history_frame(make_request())
+    assert len(frame) == 11
+    assert calls == [(START, END)]
+
+    calls.clear()
+    frame = gateway.rest_api.query_history_frame(make_request())
+    assert len(frame) == 11
+    assert calls == [(END - 60, END)]
+
+
+def test_head_download_extends_cover(gateway: MexcGateway, tmp_path: Path):
+    cache = MexcKlineCache(tmp_path)
+    gateway.rest_api.kline_cache = cache
+    calls = stub_download(gateway)
+
+    gateway.rest_api.query_history_frame(make_request())
+    calls.clear()
+    frame = gateway.rest_api.query_history_frame(make_request(START - 300, END))
+
+    assert len(frame) == 16
+    assert calls[0] == (START - 300, START)
+    _, cache_start, cache_end = cache.load(make_request(), "MEXC")
+    assert (cache_start, cache_end) == (START - 300, END)
+
+
+def test_failed_download_is_not_cached(gateway: MexcGateway, tmp_path: Path):
+    cache = MexcKlineCache(tmp_path)
+    gateway.rest_api.kline_cache = cache
+    stub_download(gateway, success=False)
+
+    gateway.rest_api.query_history_frame(make_request())
+
+    assert not cache.get_path("BTC_USDT", Interval.MINUTE).exists()
+
+
+def test_failed_head_keeps_old_cover(gateway: MexcGateway, tmp_path: Path):
+    cache = MexcKlineCache(tmp_path)
+    gateway.rest_api.kline_cache = cache
+    stub_download(gateway)
+    gateway.rest_api.query_history_frame(make_request())
+
+    stub_download(gateway, success=False)
+    gateway.rest_api.query_history_frame(make_request(START - 300, END))
+
+    _, cache_start, cache_end = cache.load(make_request(), "MEXC")
+    assert (cache_start, cache_end) == (START, END)
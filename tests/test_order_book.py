@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcDataWebsocketApi, MexcGateway, MexcOrderBook
+
+
+def make_book() -> MexcOrderBook:
+    book = MexcOrderBook("BTC_USDT")
+    book.apply_snapshot({
+        "version": 10,
+        "bids": [[99, 1, 1], [101, 2, 1], [100, 3, 1]],
+        "asks": [[103, 4, 1], [102, 5, 1]],
+    })
+    return book
+
+
+def test_snapshot_sorts_levels_from_best():
+    book = make_book()
+
+    assert book.inited
+    assert book.version == 10
+    assert book.get_bids() == [(101, 2), (100, 3), (99, 1)]
+    assert book.get_asks() == [(102, 5), (103, 4)]
+    assert book.get_bids(2) == [(101, 2), (100, 3)]
+
+
+def test_update_changes_inserts_and_deletes_levels():
+    book = make_book()
+
+    assert book.update({
+        "version": 11,
+        "bids": [[101, 0, 0], [100, 7, 1], [100.5, 1, 1]],
+        "asks": [[101.5, 2, 1]],
+    })
+
+    assert book.version == 11
+    assert book.get_bids() == [(100.5, 1), (100, 7), (99, 1)]
+    assert book.get_asks() == [(101.5, 2), (102, 5), (103, 4)]
+
+
+def test_update_ignores_old_versions():
+    book = make_book()
+
+    assert book.update({"version": 9, "bids": [[101, 0, 0]]})
+    assert book.get_bids(1) == [(101, 2)]
+
+
+def test_update_rejects_version_gap():
+    book = make_book()
+
+    assert not book.update({"version": 12, "bids": [[101, 0, 0]]})
+    assert book.version == 10
+    assert book.get_bids(1) == [(101, 2)]
+
+
+def test_clear_resets_book():
+    book = make_book()
+    book.clear()
+
+    assert not book.inited
+    assert book.version == 0
+    assert book.get_bids() == []
+    assert book.get_asks() == []
+
+
+def test_buffer_keeps_latest_updates(monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "DEPTH_BUFFER_SIZE", 3)
+    book = MexcOrderBook("BTC_USDT")
+    for version in range(1, 6):
+        book.buffer_update({"version": version})
+
+    assert [data["version"] for data in book.buffer] == [3, 4, 5]
+
+
+class ImmediateLoop:
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+def test_snapshot_error_allows_resync(gateway: MexcGateway):
+    requests = []
+    gateway.rest_api.add_request = lambda **kwargs: requests.append(kwargs)
+    api = MexcDataWebsocketApi(gateway)
+    api._loop = ImmediateLoop()
+    book = MexcOrderBook("BTC_USDT")
+    api.books["BTC_USDT"] = book
+
+    packet = {"symbol": "BTC_USDT", "data": {"version": 11}, "ts": 0}
+    api.on_depth_update(packet)
+    assert book.syncing
+    assert len(requests) == 1
+
+    request = requests[0]
+    request["on_error"](ConnectionResetError, ConnectionResetError(), None, SimpleNamespace(extra="BTC_USDT"))
+    assert not book.syncing
+
+    api.on_depth_update({"symbol": "BTC_USDT", "data": {"version": 12}, "ts": 0})
+    assert len(requests) == 2
+    assert [data["version"] for data in book.buffer] == [11, 12]
@@ -0,0 +1,58 @@
+from vnpy.trader.constant import Status
+
+from vnpy_mexc.mexc_gateway import MexcOrderStore
+
+from conftest import make_order
+
+
+def test_active_orders_are_kept_as_copies():
+    store = MexcOrderStore()
+    order = make_order("1")
+    store.put(order)
+    order.traded = 1
+
+    assert store.get("1").traded == 0
+    assert [order.orderid for order in store.get_active_orders()] == ["1"]
+
+
+def test_finished_order_moves_to_archive():
+    store = MexcOrderStore()
+    store.put(make_order("1"))
+    store.put(make_order("1", status=Status.ALLTRADED, traded=1))
+
+    assert store.get_active_orders() == []
+    assert "1" in store.archive
+    order = store.get("1")
+    assert order.status == Status.ALLTRADED
+    assert order.traded == 1
+    assert order.vt_orderid == "MEXC.1"
+
+
+def test_archive_evicts_least_recently_used():
+    store = MexcOrderStore(archive_size=2)
+    for orderid in ("1", "2"):
+        store.put(make_order(orderid, status=Status.CANCELLED))
+    store.get("1")
+    store.put(make_order("3", status=Status.CANCELLED))
+
+    assert store.get("2") is None
+    assert store.get("1") is not None
+    assert store.get("3") is not None
+    assert len(store) == 2
+
+
+def test_archive_evicts_expired_orders():
+    store = MexcOrderStore(archive_ttl=0)
+    store.put(make_order("1", status=Status.CANCELLED))
+
+    assert store.get("1") is None
+    assert len(store) == 0
+
+
+def test_reactivated_order_leaves_archive():
+    store = MexcOrderStore()
+    store.put(make_order("1", status=Status.REJECTED))
+    store.put(make_order("1"))
+
+    assert not store.archive
+    assert store.get("1").status == Status.NOTTRADED
@@ -0,0 +1,137 @@
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from vnpy.trader.constant import Direction, Exchange, OrderType, Status
+from vnpy.trader.object import CancelRequest, OrderRequest
+
+from vnpy_mexc.mexc_gateway import MexcGateway, MexcPageQuery
+
+
+def make_request() -> OrderRequest:
+    return OrderRequest(
+        symbol="BTC_USDT",
+        exchange=Exchange.MEXC,
+        direction=Direction.LONG,
+        type=OrderType.LIMIT,
+        volume=1,
+        price=100,
+    )
+
+
+def send_order(gateway: MexcGateway) -> str:
+    vt_orderid = gateway.send_order(make_request())
+    gateway.rest_api.bridge_executor.shutdown(wait=True)
+    return vt_orderid.split(".", 1)[1]
+
+
+def test_unknown_push_is_not_held_without_submitting_orders(gateway: MexcGateway):
+    assert not gateway.hold_order_push("S1", {}, lambda packet: None)
+
+
+def test_push_is_held_until_orderid_is_mapped(gateway: MexcGateway):
+    released = []
+    gateway.rest_api.submitting_count = 1
+
+    assert gateway.hold_order_push("S1", {"id": 1}, released.append)
+    gateway.map_orderid("L1", "S1")
+
+    gateway.rest_api.submitting_count = 0
+    gateway.release_order_pushes()
+    assert released == [{"id": 1}]
+    assert not gateway.hold_order_push("S1", {"id": 2}, released.append)
+    assert gateway.get_local_orderid("S1") == "L1"
+    assert gateway.get_sys_orderid("L1") == "S1"
+
+
+def test_newer_push_waits_for_held_pushes_of_same_order(gateway: MexcGateway):
+    released = []
+    gateway.rest_api.submitting_count = 1
+    gateway.hold_order_push("S1", {"state": "old"}, released.append)
+
+    # 映射后、重新处理暂存推送前到达的推送排在暂存推送之后
+    gateway.map_orderid("L1", "S1")
+    gateway.rest_api.submitting_count = 0
+    assert gateway.hold_order_push("S1", {"state": "new"}, released.append)
+
+    gateway.release_order_pushes()
+    assert released == [{"state": "old"}, {"state": "new"}]
+    assert not gateway.hold_order_push("S1", {"state": "later"}, released.append)
+
+
+def test_map_sends_pending_cancel(gateway: MexcGateway):
+    cancels = []
+    gateway.rest_api.cancel_order = cancels.append
+    req = CancelRequest(orderid="L1", symbol="BTC_USDT", exchange=Exchange.MEXC)
+    gateway.pending_cancels["L1"] = req
+
+    gateway.map_orderid("L1", "S1")
+
+    assert cancels == [req]
+    assert not gateway.pending_cancels
+
+
+def test_bridge_order_success_maps_orderid(gateway: MexcGateway, recorder):
+    gateway.rest_api.post_bridge_order = lambda req: ("S1", False)
+
+    orderid = send_order(gateway)
+
+    assert [order.status for order in recorder.orders] == [Status.SUBMITTING, Status.NOTTRADED]
+    assert gateway.get_sys_orderid(orderid) == "S1"
+    assert gateway.rest_api.submitting_count == 0
+
+
+def test_bridge_order_error_rejects_and_drops_pending_cancel(gateway: MexcGateway):
+    cancel_all = []
+    gateway.rest_api.cancel_all = lambda: cancel_all.append(True)
+
+    def post_bridge_order(req):
+        # 下单期间收到撤单
+        orderid = gateway.orders.get_active_orders()[0].orderid
+        gateway.cancel_order(CancelRequest(orderid=orderid, symbol="BTC_USDT", exchange=Exchange.MEXC))
+        raise ConnectionError("bridge down")
+
+    gateway.rest_api.post_bridge_order = post_bridge_order
+
+    orderid = send_order(gateway)
+
+    assert gateway.get_order(orderid).status == Status.REJECTED
+    assert not gateway.pending_cancels
+    assert cancel_all == [True]
+    assert gateway.rest_api.submitting_count == 0
+
+
+class FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def post(self, *args, **kwargs):
+        raise self.error
+
+
+def test_bridge_connect_error_rejects(gateway: MexcGateway):
+    cancel_all = []
+    gateway.rest_api.cancel_all = lambda: cancel_all.append(True)
+    error = requests.ConnectionError(requests.urllib3.exceptions.MaxRetryError(
+        None, "/place_limit_order", NewConnectionError(None, "refused")
+    ))
+    gateway.rest_api.get_bridge_session = lambda: FailingSession(error)
+
+    orderid = send_order(gateway)
+
+    assert gateway.get_order(orderid).status == Status.REJECTED
+    assert cancel_all == [True]
+
+
+def test_bridge_timeout_queries_order_instead_of_rejecting(gateway: MexcGateway, monkeypatch):
+    queries = []
+    cancel_all = []
+    monkeypatch.setattr(MexcPageQuery, "start", lambda self: queries.append(self))
+    gateway.rest_api.cancel_all = lambda: cancel_all.append(True)
+    gateway.rest_api.get_bridge_session = lambda: FailingSession(requests.ReadTimeout("read timed out"))
+
+    orderid = send_order(gateway)
+
+    assert gateway.get_order(orderid).status == Status.SUBMITTING
+    assert gateway.rest_api.submitting_count == 1
+    assert len(queries) == 1
+    assert not cancel_all
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcGateway, MexcPageQuery
+
+
+def start_query(gateway: MexcGateway, monkeypatch) -> tuple:
+    requests = []
+    results = []
+    monkeypatch.setattr(gateway.rest_api, "add_request", lambda **kwargs: requests.append(kwargs))
+
+    query = MexcPageQuery(
+        gateway.rest_api,
+        "/api/v1/private/order/list/open_orders",
+        "orderId",
+        results.append,
+        "查询委托",
+        params={"symbol": "BTC_USDT"}
+    )
+    query.start()
+    return query, requests, results
+
+
+def reply(query: MexcPageQuery, page: int, page_data) -> None:
+    query.on_page({"success": True, "code": 0, "data": page_data}, SimpleNamespace(extra=page))
+
+
+def make_records(*orderids) -> list:
+    return [{"orderId": orderid, "page": None} for orderid in orderids]
+
+
+def test_total_page_requests_remaining_pages_at_once(gateway: MexcGateway, monkeypatch):
+    query, requests, results = start_query(gateway, monkeypatch)
+    assert [request["params"] for request in requests] == [
+        {"symbol": "BTC_USDT", "page_num": 1, "page_size": mexc_gateway.ORDER_PAGE_SIZE}
+    ]
+
+    reply(query, 1, {"resultList": make_records(1, 2), "totalPage": 3})
+    assert [request["extra"] for request in requests] == [1, 2, 3]
+
+    reply(query, 3, {"resultList": make_records(5), "totalPage": 3})
+    assert results == []
+    reply(query, 2, {"resultList": make_records(3, 4), "totalPage": 3})
+
+    assert [[record["orderId"] for record in records] for records in results] == [[1, 2, 3, 4, 5]]
+
+
+def test_full_page_without_total_requests_next_batch(gateway: MexcGateway, monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "ORDER_PAGE_SIZE", 2)
+    monkeypatch.setattr(mexc_gateway, "ORDER_PAGE_BATCH", 2)
+    query, requests, results = start_query(gateway, monkeypatch)
+
+    reply(query, 1, make_records(1, 2))
+    assert [request["extra"] for request in requests] == [1, 2, 3]
+
+    # 只有最后一页满页时才继续查询
+    reply(query, 2, make_records(3, 4))
+    assert len(requests) == 3
+    reply(query, 3, make_records(5, 6))
+    assert [request["extra"] for request in requests] == [1, 2, 3, 4, 5]
+
+    reply(query, 5, [])
+    reply(query, 4, make_records(7))
+
+    assert [[record["orderId"] for record in records] for records in results] == [[1, 2, 3, 4, 5, 6, 7]]
+
+
+def test_records_are_merged_by_page_and_deduplicated(gateway: MexcGateway, monkeypatch):
+    query, requests, results = start_query(gateway, monkeypatch)
+
+    reply(query, 1, {"resultList": [{"orderId": 1, "page": 1}, {"orderId": 2, "page": 1}], "totalPage": 2})
+    # 翻页期间委托移动位置，同一委托出现在两页中，保留后一页的数据
+    reply(query, 2, {"resultList": [{"orderId": 2, "page": 2}, {"orderId": 3, "page": 2}], "totalPage": 2})
+
+    assert results == [[
+        {"orderId": 1, "page": 1},
+        {"orderId": 2, "page": 2},
+        {"orderId": 3, "page": 2},
+    ]]
+
+
+def test_failed_page_still_finishes_query(gateway: MexcGateway, monkeypatch):
+    query, requests, results = start_query(gateway, monkeypatch)
+
+    reply(query, 1, {"resultList": make_records(1), "totalPage": 2})
+    query.on_page_failed(500, SimpleNamespace(extra=2, response=SimpleNamespace(text="")))
+
+    assert [[record["orderId"] for record in records] for records in results] == [[1]]
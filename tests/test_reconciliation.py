@@ -0,0 +1,73 @@
+from vnpy.trader.constant import Offset, OrderType, Status
+
+from vnpy_mexc.mexc_gateway import MexcGateway, MexcPageQuery
+
+from conftest import make_order
+
+
+def test_unchanged_order_is_not_pushed(gateway: MexcGateway, recorder):
+    gateway.on_order(make_order("1"))
+    gateway.update_order(make_order("1"))
+
+    assert len(recorder.orders) == 1
+
+
+def test_changed_order_keeps_offset(gateway: MexcGateway, recorder):
+    gateway.on_order(make_order("1", offset=Offset.CLOSE))
+    gateway.update_order(make_order("1", status=Status.PARTTRADED, traded=0.5))
+
+    assert len(recorder.orders) == 2
+    assert gateway.get_order("1").offset == Offset.CLOSE
+
+
+def test_finished_order_is_not_replaced(gateway: MexcGateway, recorder):
+    gateway.on_order(make_order("1", status=Status.CANCELLED))
+    gateway.update_order(make_order("1", status=Status.NOTTRADED))
+
+    assert len(recorder.orders) == 1
+    assert gateway.get_order("1").status == Status.CANCELLED
+
+
+def test_traded_volume_is_not_lowered(gateway: MexcGateway, recorder):
+    gateway.on_order(make_order("1", status=Status.PARTTRADED, traded=0.6))
+    gateway.update_order(make_order("1", status=Status.PARTTRADED, traded=0.4))
+
+    assert len(recorder.orders) == 1
+    assert gateway.get_order("1").traded == 0.6
+
+
+def test_reconciliation_is_off_by_default():
+    assert MexcGateway.default_setting["对账间隔(秒)"] == 0
+
+
+def test_missing_plan_order_is_resolved_from_history(gateway: MexcGateway, monkeypatch):
+    queries = []
+
+    def start(self):
+        queries.append(self)
+
+    monkeypatch.setattr(MexcPageQuery, "start", start)
+    gateway.on_order(make_order("1", type=OrderType.STOP))
+    gateway.on_order(make_order("2", type=OrderType.STOP, status=Status.SUBMITTING))
+    gateway.map_orderid("1", "S1")
+
+    gateway.rest_api.on_query_order_Algo([])
+
+    assert len(queries) == 1
+    query = queries[0]
+    assert query.params == {"states": "2,3,4,5"}
+
+    plan_data = {
+        "id": "S1",
+        "symbol": "BTC_USDT",
+        "triggerPrice": 100,
+        "vol": 1,
+        "side": 1,
+        "state": 2,
+        "createTime": 1700000000000,
+    }
+    query.callback([plan_data, dict(plan_data, id="S9")])
+
+    assert gateway.get_order("1").status == Status.CANCELLED
+    assert gateway.get_order("2").status == Status.SUBMITTING
+    assert gateway.get_order("S9") is None
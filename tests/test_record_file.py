@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import numpy as np
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcRecordFile
+
+
+DTYPE = np.dtype([("time", np.int64), ("price", np.float64)])
+
+
+def test_records_survive_growth_and_reopen(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(mexc_gateway, "RECORD_CHUNK_SIZE", 2)
+    path = tmp_path.joinpath("records.dat")
+    record_file = MexcRecordFile(path, DTYPE, 1)
+
+    for i in range(5):
+        record_file.append((i, i + 0.5))
+    assert record_file.capacity == 6
+    record_file.close()
+    assert record_file.mmap is None
+
+    record_file = MexcRecordFile(path, DTYPE, 1)
+    assert record_file.count == 5
+    assert record_file.records["time"][:5].tolist() == [0, 1, 2, 3, 4]
+    assert record_file.records["price"][4] == 4.5
+    record_file.close()
@@ -0,0 +1,82 @@
+from time import sleep, time
+from types import SimpleNamespace
+
+import vnpy_mexc.mexc_gateway as mexc_gateway
+from vnpy_mexc.mexc_gateway import MexcGateway
+
+
+def add_request(gateway: MexcGateway, path: str, callback=None, on_failed=None) -> None:
+    gateway.rest_api.add_request(
+        method="POST",
+        path=path,
+        callback=callback or (lambda data, request: None),
+        on_failed=on_failed
+    )
+
+
+def test_cancel_is_sent_before_queued_queries(gateway: MexcGateway, monkeypatch):
+    sent = []
+    monkeypatch.setattr(mexc_gateway.RestClient, "add_request", lambda self, **kwargs: sent.append(kwargs["path"]))
+
+    add_request(gateway, "/api/v1/private/order/list/open_orders")
+    add_request(gateway, "/api/v1/private/order/submit")
+    add_request(gateway, "/api/v1/private/order/cancel")
+    add_request(gateway, "/api/v1/private/account/assets")
+
+    scheduler = gateway.rest_api.scheduler
+    scheduler.start()
+    end_time = time() + 1
+    while len(sent) < 4 and time() < end_time:
+        sleep(0.01)
+    scheduler.stop()
+
+    assert sent == [
+        "/api/v1/private/order/cancel",
+        "/api/v1/private/order/submit",
+        "/api/v1/private/order/list/open_orders",
+        "/api/v1/private/account/assets",
+    ]
+
+
+def take_request(gateway: MexcGateway) -> dict:
+    _, _, kwargs = gateway.rest_api.scheduler.queues["private"].get_nowait()
+    return kwargs
+
+
+def test_rate_limit_code_backs_off_exponentially(gateway: MexcGateway):
+    received = []
+    scheduler = gateway.rest_api.scheduler
+    bucket = scheduler.buckets["private"]
+    rate = bucket.rate
+
+    add_request(gateway, "/api/v1/private/order/submit", callback=lambda data, request: received.append(data))
+    callback = take_request(gateway)["callback"]
+
+    callback({"success": False, "code": 510}, None)
+    assert scheduler.failures["private"] == 1
+    assert bucket.tokens <= -mexc_gateway.BACKOFF_SECONDS * rate
+
+    callback({"success": False, "code": 510}, None)
+    assert scheduler.failures["private"] == 2
+    assert bucket.tokens <= -mexc_gateway.BACKOFF_SECONDS * 2 * rate
+
+    callback({"success": True, "code": 0}, None)
+    assert scheduler.failures["private"] == 0
+    assert len(received) == 3
+    assert scheduler.failures["market"] == 0
+
+
+def test_http_429_backs_off_and_calls_on_failed(gateway: MexcGateway):
+    failed = []
+    scheduler = gateway.rest_api.scheduler
+
+    add_request(gateway, "/api/v1/private/order/cancel", on_failed=lambda status_code, request: failed.append(status_code))
+    on_failed = take_request(gateway)["on_failed"]
+
+    on_failed(429, SimpleNamespace())
+    assert scheduler.failures["private"] == 1
+    assert scheduler.buckets["private"].tokens < 0
+
+    on_failed(500, SimpleNamespace())
+    assert scheduler.failures["private"] == 1
+    assert failed == [429, 500]
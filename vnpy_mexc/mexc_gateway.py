@@ -1,12 +1,32 @@
 import json
 import hmac
+import logging
+import mmap
 import sys
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
+from dataclasses import fields
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 from time import time,sleep
-from threading import Lock
-from typing import Dict, List, Any,Union
+from queue import PriorityQueue, SimpleQueue
+from threading import Lock, Thread, Timer, local
+from typing import Callable, Dict, List, Any, Tuple, Union
+import numpy as np
 import requests
+from urllib3.exceptions import NewConnectionError
+
+# 优先使用更快的json解码库
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        from json import loads as json_loads
 
 from vnpy.event import Event,EventEngine
 from vnpy_rest import RestClient, Request
@@ -39,7 +59,7 @@ from vnpy.trader.object import (
     HistoryRequest
 )
 from vnpy.trader.event import EVENT_TIMER
-from vnpy.trader.utility import round_to,ZoneInfo
+from vnpy.trader.utility import round_to,ZoneInfo,get_folder_path,load_json,save_json
 
 
 # 中国时区
@@ -102,6 +122,178 @@ TIMEDELTA_MAP: Dict[Interval, timedelta] = {
     Interval.DAILY: timedelta(days=1),
 }
 
+# 成交K线推送事件
+EVENT_MEXC_BAR = "eMexcBar."
+
+# 成交K线在周期结束后等待迟到成交的时间(毫秒)
+BAR_CLOSE_DELAY = 1000
+
+# K线周期秒数与vnpy的Interval对应关系
+WINDOW_INTERVAL_MAP: Dict[int, Interval] = {
+    60: Interval.MINUTE,
+    3600: Interval.HOUR,
+    86400: Interval.DAILY,
+}
+
+# 北京时间相对UTC的毫秒数，K线周期和记录文件按北京时间对齐
+CHINA_OFFSET_MS = 28800000
+
+# 深度行情模式
+DEPTH_MODE_FULL = "全量"           # sub.depth.full，每次推送前5档
+DEPTH_MODE_INCREMENTAL = "增量"    # sub.depth，本地维护完整订单簿
+# 等待深度快照期间最多缓存的增量推送数量，超过后丢弃最早的推送(回放时版本不连续会重新同步)
+DEPTH_BUFFER_SIZE = 1000
+
+# 浏览器下单接口(mexc_selenium)
+BRIDGE_HOST = "http://localhost:5102"
+BRIDGE_WORKERS = 4
+BRIDGE_TIMEOUT = 30
+# 查询浏览器下单结果未知的委托时，查询时间段前后放宽的毫秒数
+BRIDGE_TIME_TOLERANCE = 5000
+
+# 历史K线单次查询上限和并发线程数
+HISTORY_LIMIT = 2000
+HISTORY_WORKERS = 5
+
+# 委托分页查询每页数量，总页数未知时每批并发查询的页数
+ORDER_PAGE_SIZE = 100
+ORDER_PAGE_BATCH = 4
+
+# 撤单合并窗口(秒)和单次批量撤单上限
+CANCEL_BATCH_WINDOW = 0.005
+CANCEL_BATCH_SIZE = 50
+
+# REST请求优先级，数值越小越先发送
+PRIORITY_CANCEL = 0
+PRIORITY_ORDER = 1
+PRIORITY_QUERY = 2
+
+# REST接口分组：(路径前缀，限速分组，优先级)，按顺序匹配
+REQUEST_GROUPS: List[Tuple[str, str, int]] = [
+    ("/api/v1/private/order/cancel", "private", PRIORITY_CANCEL),
+    ("/api/v1/private/planorder/cancel", "private", PRIORITY_CANCEL),
+    ("/api/v1/private/order/submit", "private", PRIORITY_ORDER),
+    ("/api/v1/private/planorder/place", "private", PRIORITY_ORDER),
+    ("/api/v1/private/position/change_leverage", "private", PRIORITY_ORDER),
+    ("/api/v1/private", "private", PRIORITY_QUERY),
+    ("/api/v1/contract", "market", PRIORITY_QUERY),
+]
+
+# 限速分组：(每秒请求数，令牌桶容量)
+RATE_LIMIT_MAP: Dict[str, Tuple[float, float]] = {
+    "private": (10, 20),
+    "market": (10, 20),
+}
+
+# 触发限频的错误码，收到后暂停该分组并指数退避
+RATE_LIMIT_CODES = {510}
+BACKOFF_SECONDS = 1
+BACKOFF_MAX_SECONDS = 16
+
+# 合约信息本地快照文件
+CONTRACT_SNAPSHOT_NAME = "mexc_contract_snapshot.json"
+
+# 已结束委托归档：最多保留数量，最近访问后保留秒数
+ORDER_ARCHIVE_SIZE = 20000
+ORDER_ARCHIVE_TTL = 86400
+
+# 归档委托以元组保存的字段
+ORDER_ARCHIVE_FIELDS: Tuple[str, ...] = (
+    "gateway_name",
+    "symbol",
+    "exchange",
+    "orderid",
+    "type",
+    "direction",
+    "offset",
+    "price",
+    "volume",
+    "traded",
+    "status",
+    "datetime",
+    "reference",
+)
+
+# 委托/成交/持仓事件日志：追加写入条数达到JOURNAL_COMPACT_SIZE后压缩，
+# 压缩时保留活动委托、最新持仓以及JOURNAL_KEEP_SECONDS秒内的已结束委托和成交
+JOURNAL_NAME = "mexc_journal"
+JOURNAL_COMPACT_SIZE = 100000
+JOURNAL_KEEP_SECONDS = 86400
+
+JOURNAL_DATA_TYPES: Dict[str, type] = {
+    "order": OrderData,
+    "trade": TradeData,
+    "position": PositionData,
+}
+
+JOURNAL_ENUM_TYPES: Dict[str, type] = {
+    "exchange": Exchange,
+    "type": OrderType,
+    "direction": Direction,
+    "offset": Offset,
+    "status": Status,
+}
+
+# 私有频道报文日志：内存中保留的最近报文数量
+PACKET_BUFFER_SIZE = 1000
+
+PACKET_LOG_LEVELS: Dict[str, int] = {
+    "禁用": logging.CRITICAL + 1,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+}
+
+# 各频道报文日志级别，未列出的频道为DEBUG
+PACKET_CHANNEL_LEVELS: Dict[str, int] = {
+    "rs.error": logging.WARNING,
+    "push.personal.order": logging.INFO,
+    "push.personal.plan.order": logging.INFO,
+    "push.personal.stop.planorder": logging.INFO,
+    "push.personal.position": logging.INFO,
+}
+
+# 各频道报文日志采样间隔：每N条写入一条，未列出的频道全部写入
+PACKET_CHANNEL_SAMPLING: Dict[str, int] = {
+    "push.personal.asset": 10,
+    "push.personal.liquidate.risk": 10,
+}
+
+# 每次定时发送的订阅合约数量
+SUBSCRIBE_BATCH_SIZE = 30
+
+# 行情记录文件：16字节文件头(记录数，单条记录字节数)+定长结构化记录
+RECORD_HEADER_SIZE = 16
+RECORD_CHUNK_SIZE = 65536
+RECORD_DEPTH_LEVELS = 20
+
+TICKER_RECORD_DTYPE = np.dtype([
+    ("timestamp", "i8"),
+    ("localtime", "i8"),
+    ("last_price", "f8"),
+    ("bid_price_1", "f8"),
+    ("ask_price_1", "f8"),
+    ("volume", "f8"),
+    ("high_price", "f8"),
+    ("low_price", "f8"),
+    ("open_interest", "f8"),
+])
+
+DEPTH_RECORD_DTYPE = np.dtype([
+    ("timestamp", "i8"),
+    ("localtime", "i8"),
+    ("version", "i8"),
+    ("bid_prices", "f8", (RECORD_DEPTH_LEVELS,)),
+    ("bid_volumes", "f8", (RECORD_DEPTH_LEVELS,)),
+    ("ask_prices", "f8", (RECORD_DEPTH_LEVELS,)),
+    ("ask_volumes", "f8", (RECORD_DEPTH_LEVELS,)),
+])
+
+RECORD_DTYPE_MAP: Dict[str, np.dtype] = {
+    "ticker": TICKER_RECORD_DTYPE,
+    "depth": DEPTH_RECORD_DTYPE,
+}
+
 # 合约数据全局缓存字典
 symbol_contract_map: Dict[str, ContractData] = {}
 
@@ -119,6 +311,15 @@ class MexcGateway(BaseGateway):
         "Secret Key": "",
         "代理地址": "",
         "代理端口": "",
+        "深度模式": [DEPTH_MODE_FULL, DEPTH_MODE_INCREMENTAL],
+        "行情合并窗口(毫秒)": 0,
+        "行情连接数": 1,
+        "单连接最大合约数": 0,
+        "行情记录": ["禁用", "启用"],
+        "成交K线周期(秒)": "",
+        "K线缓存": ["启用", "禁用"],
+        "对账间隔(秒)": 0,
+        "报文日志级别": ["INFO", "DEBUG", "WARNING", "禁用"],
     }
 
     exchanges = [Exchange.MEXC]        #由main_engine add_gateway调用
@@ -127,11 +328,27 @@ class MexcGateway(BaseGateway):
         """
         """
         super(MexcGateway,self).__init__(event_engine, gateway_name)
-        self.orders: Dict[str, OrderData] = {}
+        self.orders: MexcOrderStore = MexcOrderStore()
+        self.packet_logger: MexcPacketLogger = MexcPacketLogger(gateway_name)
+        self.journal: MexcEventJournal = MexcEventJournal(gateway_name)
+        self.journal_replaying: bool = False
+
+        # 本地委托号与交易所委托号映射
+        self.local_sys_map: Dict[str, str] = {}
+        self.sys_local_map: Dict[str, str] = {}
+        self.pending_cancels: Dict[str, CancelRequest] = {}
+        self.held_pushes: List[Tuple[str, Callable, dict]] = []
+        self.held_orderids: set = set()
+        self.orderid_lock: Lock = Lock()
         self.rest_api = MexcRestApi(self)
         self.trade_ws_api = MexcTradeWebsocketApi(self)
-        self.market_ws_api = MexcDataWebsocketApi(self)
+        self.market_ws_api = MexcDataWebsocketPool(self)
         self.count = 0  #轮询计时:秒
+        self.reconcile_interval: int = 0
+
+        # 最近推送的资金和持仓，用于对账时只推送有变化的数据
+        self.accounts: Dict[str, AccountData] = {}
+        self.positions: Dict[str, PositionData] = {}
     #------------------------------------------------------------------------------------------------- 
     def connect(self,setting:dict = {}):
         """
@@ -141,10 +358,32 @@ class MexcGateway(BaseGateway):
         secret = setting["Secret Key"]
         proxy_host = setting["代理地址"]
         proxy_port = setting["代理端口"]
-
-        self.rest_api.connect(key, secret,proxy_host, proxy_port)
+        depth_mode = setting.get("深度模式", DEPTH_MODE_FULL)
+        conflate_window = int(setting.get("行情合并窗口(毫秒)", 0))
+        session_count = int(setting.get("行情连接数", 1))
+        max_symbols = int(setting.get("单连接最大合约数", 0))
+        record_enabled = setting.get("行情记录", "禁用") == "启用"
+        kline_cache = setting.get("K线缓存", "启用") == "启用"
+        self.reconcile_interval = int(setting.get("对账间隔(秒)", 0))
+        bar_windows = [int(window) for window in str(setting.get("成交K线周期(秒)", "")).split(",") if window.strip()]
+        packet_log_level = setting.get("报文日志级别", "INFO")
+
+        self.packet_logger.start(get_folder_path("log"), PACKET_LOG_LEVELS[packet_log_level])
+        self.replay_journal(self.journal.open(get_folder_path(JOURNAL_NAME)))
+        self.rest_api.connect(key, secret,proxy_host, proxy_port, kline_cache)
         self.trade_ws_api.connect(key, secret, proxy_host, proxy_port)
-        self.market_ws_api.connect(key, secret, proxy_host, proxy_port)
+        self.market_ws_api.connect(
+            key,
+            secret,
+            proxy_host,
+            proxy_port,
+            depth_mode,
+            conflate_window,
+            session_count,
+            max_symbols,
+            record_enabled,
+            bar_windows
+        )
 
         self.init_query()
     #------------------------------------------------------------------------------------------------- 
@@ -178,42 +417,255 @@ class MexcGateway(BaseGateway):
         """
         self.rest_api.query_order(symbol)
     #-------------------------------------------------------------------------------------------------  
-    def query_position(self, symbol: str):
+    def query_position(self, symbol: str = ""):
         """
         查询持仓
         """
-        pass
+        self.rest_api.query_position()
     #-------------------------------------------------------------------------------------------------   
     def query_history(self, req: HistoryRequest) -> List[BarData]:
         """查询历史数据"""
         return self.rest_api.query_history(req)
+    #-------------------------------------------------------------------------------------------------
+    def query_history_frame(self, req: HistoryRequest) -> "MexcBarFrame":
+        """查询列式历史数据，需要时再调用to_bars生成BarData"""
+        return self.rest_api.query_history_frame(req)
+    #-------------------------------------------------------------------------------------------------
+    def get_order_book(self, symbol: str) -> "MexcOrderBook":
+        """
+        获取增量深度模式下的本地订单簿
+        """
+        return self.market_ws_api.get_order_book(symbol)
+    #---------------------------------------------------------------------------------------
+    def on_bar(self, bar: BarData) -> None:
+        """
+        推送成交合成的K线
+        """
+        self.on_event(EVENT_MEXC_BAR, bar)
+        self.on_event(EVENT_MEXC_BAR + bar.vt_symbol, bar)
     #---------------------------------------------------------------------------------------
     def on_order(self, order: OrderData) -> None:
         """
         收到委托单推送，BaseGateway推送数据
         """
-        self.orders[order.orderid] = copy(order)
+        self.orders.put(order)
+        if not self.journal_replaying:
+            self.journal.append("order", order)
         super().on_order(order)
     #---------------------------------------------------------------------------------------
+    def on_trade(self, trade: TradeData) -> None:
+        """
+        """
+        if not self.journal_replaying:
+            self.journal.append("trade", trade)
+        super().on_trade(trade)
+    #---------------------------------------------------------------------------------------
+    def on_account(self, account: AccountData) -> None:
+        """
+        """
+        self.accounts[account.vt_accountid] = copy(account)
+        super().on_account(account)
+    #---------------------------------------------------------------------------------------
+    def on_position(self, position: PositionData) -> None:
+        """
+        """
+        self.positions[position.vt_positionid] = copy(position)
+        if not self.journal_replaying:
+            self.journal.append("position", position)
+        super().on_position(position)
+    #---------------------------------------------------------------------------------------
+    def replay_journal(self, records: List[Tuple[str, Any]]) -> None:
+        """
+        用事件日志恢复委托号映射、委托、成交和持仓，并写入已知的累计成交避免重复推送成交
+        """
+        if not records:
+            return
+
+        fills: Dict[str, List[float]] = {}
+        self.journal_replaying = True
+        try:
+            for kind, data in records:
+                if kind == "map":
+                    local_orderid, sys_orderid = data
+                    self.local_sys_map[local_orderid] = sys_orderid
+                    self.sys_local_map[sys_orderid] = local_orderid
+                elif kind == "order":
+                    self.on_order(data)
+                elif kind == "trade":
+                    fill = fills.setdefault(data.orderid, [0, 0])
+                    fill[0] += data.volume
+                    fill[1] += data.volume * data.price
+                    self.on_trade(data)
+                elif kind == "position":
+                    self.on_position(data)
+        finally:
+            self.journal_replaying = False
+
+        # 退出前仍在下单中的委托：没有交易所委托号的视为下单失败，已有委托号的交由委托查询确认状态
+        for order in self.orders.get_active_orders():
+            if order.status != Status.SUBMITTING:
+                continue
+            order = copy(order)
+            if order.orderid in self.local_sys_map:
+                order.status = Status.NOTTRADED
+            else:
+                order.status = Status.REJECTED
+            self.on_order(order)
+
+        for order in self.orders.get_active_orders():
+            fills.setdefault(order.orderid, [0, 0])
+        for orderid, (volume, turnover) in fills.items():
+            order = self.get_order(orderid)
+            traded = max(volume, order.traded if order else 0)
+            if not traded:
+                continue
+            price = turnover / volume if volume else order.price
+            self.trade_ws_api.fill_tracker.seed(self.local_sys_map.get(orderid, orderid), traded, price)
+
+        self.write_log(f"事件日志恢复完成，记录数：{len(records)}")
+    #---------------------------------------------------------------------------------------
+    def update_order(self, order: OrderData) -> None:
+        """
+        对账用：委托状态、成交量、价格或数量有变化时才推送
+
+        REST数据可能晚于推送，已结束的委托和已推送的成交量不会被回退
+        """
+        cached = self.get_order(order.orderid)
+        if cached:
+            if not cached.is_active() or order.traded < cached.traded:
+                return
+            if order.offset == Offset.NONE:
+                order.offset = cached.offset
+            if (
+                cached.status == order.status
+                and cached.traded == order.traded
+                and cached.price == order.price
+                and cached.volume == order.volume
+            ):
+                return
+        self.on_order(order)
+    #---------------------------------------------------------------------------------------
+    def update_account(self, account: AccountData) -> None:
+        """
+        对账用：资金有变化时才推送
+        """
+        if self.accounts.get(account.vt_accountid, None) != account:
+            self.on_account(account)
+    #---------------------------------------------------------------------------------------
+    def update_position(self, position: PositionData) -> None:
+        """
+        对账用：持仓有变化时才推送
+        """
+        if self.positions.get(position.vt_positionid, None) != position:
+            self.on_position(position)
+    #---------------------------------------------------------------------------------------
+    def map_orderid(self, local_orderid: str, sys_orderid: str) -> None:
+        """
+        记录交易所委托号，发送等待中的撤单
+        """
+        with self.orderid_lock:
+            self.local_sys_map[local_orderid] = sys_orderid
+            self.sys_local_map[sys_orderid] = local_orderid
+        self.journal.append("map", (local_orderid, sys_orderid))
+
+        req = self.pending_cancels.pop(local_orderid, None)
+        if req:
+            self.rest_api.cancel_order(req)
+    #---------------------------------------------------------------------------------------
+    def get_local_orderid(self, sys_orderid: str) -> str:
+        """
+        交易所委托号转换为本地委托号，非本接口发出的委托直接使用交易所委托号
+        """
+        return self.sys_local_map.get(sys_orderid, sys_orderid)
+    #---------------------------------------------------------------------------------------
+    def get_sys_orderid(self, local_orderid: str) -> str:
+        """
+        本地委托号转换为交易所委托号，还在提交中的委托返回空字符串
+        """
+        sys_orderid = self.local_sys_map.get(local_orderid, "")
+        if sys_orderid:
+            return sys_orderid
+
+        order = self.get_order(local_orderid)
+        if order and order.status == Status.SUBMITTING:
+            return ""
+        return local_orderid
+    #---------------------------------------------------------------------------------------
+    def hold_order_push(self, sys_orderid: str, packet: dict, callback: Callable) -> bool:
+        """
+        有委托正在提交时，暂存无法识别委托号的推送，等拿到交易所委托号后再处理
+
+        该委托号已有暂存的推送时，之后到达的推送也暂存，重新处理时保持到达顺序
+        """
+        with self.orderid_lock:
+            if sys_orderid not in self.held_orderids and (
+                sys_orderid in self.sys_local_map or not self.rest_api.submitting_count
+            ):
+                return False
+            self.held_pushes.append((sys_orderid, callback, packet))
+            self.held_orderids.add(sys_orderid)
+            return True
+    #---------------------------------------------------------------------------------------
+    def release_order_pushes(self) -> None:
+        """
+        在交易Websocket线程上重新处理暂存的推送，与新到达的推送串行执行
+        """
+        loop = self.trade_ws_api._loop
+        if loop and loop.is_running():
+            loop.call_soon_threadsafe(self.replay_order_pushes)
+        else:
+            self.replay_order_pushes()
+    #---------------------------------------------------------------------------------------
+    def replay_order_pushes(self) -> None:
+        """
+        重新处理暂存的推送，仍无法识别委托号的推送会被再次暂存
+        """
+        with self.orderid_lock:
+            held_pushes = self.held_pushes
+            self.held_pushes = []
+            self.held_orderids = set()
+
+        for _, callback, packet in held_pushes:
+            callback(packet)
+    #---------------------------------------------------------------------------------------
     def get_order(self, orderid: str) -> OrderData:
         """
         用vt_orderid获取委托单数据
         """
-        return self.orders.get(orderid, None)
+        return self.orders.get(orderid)
+    #---------------------------------------------------------------------------------------
+    def get_recent_packets(self, count: int = 100) -> List[dict]:
+        """
+        获取最近收到的私有频道报文
+        """
+        return self.packet_logger.get_recent_packets(count)
     #------------------------------------------------------------------------------------------------- 
     def close(self) -> None:
         """
         关闭接口
         """
+        self.rest_api.bridge_executor.shutdown(wait=False)
+        self.packet_logger.stop()
+        self.journal.close()
         self.rest_api.stop()
         self.trade_ws_api.stop()
         self.market_ws_api.stop()
     #------------------------------------------------------------------------------------------------- 
     def process_timer_event(self, event: Event):
         """
-        处理定时任务
+        处理定时任务，定期对账委托、持仓和资金
         """
-        pass
+        if not self.reconcile_interval:
+            return
+
+        self.count += 1
+        if self.count < self.reconcile_interval:
+            return
+        self.count = 0
+
+        self.rest_api.query_account()
+        self.rest_api.query_order()
+        self.rest_api.query_position()
     #------------------------------------------------------------------------------------------------- 
     def init_query(self):
         """
@@ -221,6 +673,343 @@ class MexcGateway(BaseGateway):
         """
         self.event_engine.register(EVENT_TIMER, self.process_timer_event)
 #------------------------------------------------------------------------------------------------- 
+class MexcOrderStore:
+    """
+    委托缓存
+
+    * 活动委托保存在字典中
+    * 已结束委托(全部成交/已撤销/拒单)转为元组归档，按最近访问顺序淘汰，
+      超过ORDER_ARCHIVE_SIZE条或ORDER_ARCHIVE_TTL秒未访问即删除
+    """
+    def __init__(self, archive_size: int = ORDER_ARCHIVE_SIZE, archive_ttl: float = ORDER_ARCHIVE_TTL):
+        """
+        """
+        self.archive_size: int = archive_size
+        self.archive_ttl: float = archive_ttl
+
+        self.active_orders: Dict[str, OrderData] = {}
+        self.archive: OrderedDict[str, Tuple[float, tuple]] = OrderedDict()
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def put(self, order: OrderData) -> None:
+        """
+        保存委托
+        """
+        orderid = order.orderid
+        with self.lock:
+            if order.is_active():
+                self.active_orders[orderid] = copy(order)
+                self.archive.pop(orderid, None)
+                return
+
+            self.active_orders.pop(orderid, None)
+            self.archive[orderid] = (time(), tuple(getattr(order, field) for field in ORDER_ARCHIVE_FIELDS))
+            self.archive.move_to_end(orderid)
+            self.evict()
+    #------------------------------------------------------------------------------------------------- 
+    def get(self, orderid: str) -> OrderData:
+        """
+        获取委托，不存在时返回None
+        """
+        with self.lock:
+            order = self.active_orders.get(orderid, None)
+            if order:
+                return order
+
+            item = self.archive.get(orderid, None)
+            if not item:
+                return None
+
+            self.archive[orderid] = (time(), item[1])
+            self.archive.move_to_end(orderid)
+
+        return OrderData(**dict(zip(ORDER_ARCHIVE_FIELDS, item[1])))
+    #------------------------------------------------------------------------------------------------- 
+    def get_active_orders(self) -> List[OrderData]:
+        """
+        获取全部活动委托
+        """
+        with self.lock:
+            return list(self.active_orders.values())
+    #------------------------------------------------------------------------------------------------- 
+    def evict(self) -> None:
+        """
+        淘汰超出数量或过期的归档委托，调用前需持有锁
+        """
+        while len(self.archive) > self.archive_size:
+            self.archive.popitem(last=False)
+
+        expire_time = time() - self.archive_ttl
+        while self.archive:
+            archive_time, _ = next(iter(self.archive.values()))
+            if archive_time > expire_time:
+                break
+            self.archive.popitem(last=False)
+    #------------------------------------------------------------------------------------------------- 
+    def __len__(self) -> int:
+        """
+        """
+        return len(self.active_orders) + len(self.archive)
+#------------------------------------------------------------------------------------------------- 
+class MexcEventJournal:
+    """
+    委托/成交/持仓事件日志
+
+    * 每条事件编码为一行紧凑JSON数组：[类型，写入时间，字段值...]，追加写入
+    * 打开时读取全部记录并压缩重写
+    * 追加条数达到JOURNAL_COMPACT_SIZE后由后台线程压缩已写入的部分，只在替换文件时持锁，不阻塞推送线程
+    """
+    def __init__(self, gateway_name: str):
+        """
+        """
+        self.gateway_name: str = gateway_name
+        self.file_path: Path = None
+        self.file = None
+        self.count: int = 0
+        self.lock: Lock = Lock()
+        self.compact_thread: Thread = None
+    #------------------------------------------------------------------------------------------------- 
+    def open(self, folder: Path) -> List[Tuple[str, Any]]:
+        """
+        打开日志文件，返回压缩后的全部记录
+        """
+        self.join_compact()
+        with self.lock:
+            if self.file:
+                self.file.close()
+            self.file_path = folder.joinpath(f"{self.gateway_name}.journal")
+            records = self.read_records()
+            self.write_records(records)
+        return [(kind, data) for kind, _, data in records]
+    #------------------------------------------------------------------------------------------------- 
+    def close(self) -> None:
+        """
+        """
+        self.join_compact()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+    #------------------------------------------------------------------------------------------------- 
+    def append(self, kind: str, data: Any) -> None:
+        """
+        追加一条记录
+        """
+        with self.lock:
+            if not self.file:
+                return
+            self.file.write(self.encode(kind, time(), data))
+            self.file.flush()
+
+            self.count += 1
+            if self.count < JOURNAL_COMPACT_SIZE or self.compact_thread:
+                return
+            self.count = 0
+            self.compact_thread = Thread(target=self.compact, args=(self.file.tell(),), daemon=True)
+            self.compact_thread.start()
+    #------------------------------------------------------------------------------------------------- 
+    def join_compact(self) -> None:
+        """
+        等待后台压缩完成
+        """
+        thread = self.compact_thread
+        if thread:
+            thread.join()
+    #------------------------------------------------------------------------------------------------- 
+    def compact(self, size: int) -> None:
+        """
+        后台线程压缩文件前size字节，之后追加的记录原样保留
+        """
+        try:
+            records = self.read_records(size)
+            with self.lock:
+                if not self.file:
+                    return
+                with open(self.file_path, "rb") as f:
+                    f.seek(size)
+                    tail = f.read()
+                self.file.close()
+                self.write_records(records, tail)
+        finally:
+            self.compact_thread = None
+    #------------------------------------------------------------------------------------------------- 
+    def read_records(self, size: int = -1) -> List[Tuple[str, float, Any]]:
+        """
+        读取日志前size字节并只保留恢复所需的记录
+        """
+        maps: Dict[str, Tuple[float, tuple]] = {}
+        orders: Dict[str, Tuple[float, OrderData]] = {}
+        trades: Dict[str, Tuple[float, TradeData]] = {}
+        positions: Dict[str, Tuple[float, PositionData]] = {}
+
+        if self.file_path.exists():
+            with open(self.file_path, "rb") as f:
+                for line in f.read(size).splitlines():
+                    try:
+                        kind, timestamp, data = self.decode(line)
+                    except Exception:
+                        # 进程退出时可能残留未写完的最后一行
+                        continue
+                    if kind == "map":
+                        maps[data[0]] = (timestamp, data)
+                    elif kind == "order":
+                        orders[data.orderid] = (timestamp, data)
+                    elif kind == "trade":
+                        trades[data.tradeid] = (timestamp, data)
+                    elif kind == "position":
+                        positions[data.vt_positionid] = (timestamp, data)
+
+        expire_time = time() - JOURNAL_KEEP_SECONDS
+        orders = {
+            orderid: item for orderid, item in orders.items()
+            if item[1].is_active() or item[0] > expire_time
+        }
+        records = [("map", timestamp, data) for timestamp, data in maps.values() if data[0] in orders]
+        records.extend(("order", timestamp, data) for timestamp, data in orders.values())
+        records.extend(
+            ("trade", timestamp, data) for timestamp, data in trades.values()
+            if data.orderid in orders or timestamp > expire_time
+        )
+        records.extend(("position", timestamp, data) for timestamp, data in positions.values() if data.volume)
+        return records
+    #------------------------------------------------------------------------------------------------- 
+    def write_records(self, records: List[Tuple[str, float, Any]], tail: bytes = b"") -> None:
+        """
+        重写日志文件后重新打开，调用前需持有锁
+        """
+        temp_path = self.file_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            for kind, timestamp, data in records:
+                f.write(self.encode(kind, timestamp, data))
+            f.write(tail)
+        temp_path.replace(self.file_path)
+
+        self.file = open(self.file_path, "ab")
+        self.count = 0
+    #------------------------------------------------------------------------------------------------- 
+    def encode(self, kind: str, timestamp: float, data: Any) -> bytes:
+        """
+        """
+        if kind == "map":
+            values = list(data)
+        else:
+            values = []
+            for field in fields(data):
+                if not field.init or field.name == "extra":
+                    continue
+                value = getattr(data, field.name)
+                if field.name in JOURNAL_ENUM_TYPES:
+                    value = value.value if value else None
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+                values.append(value)
+
+        text = json.dumps([kind, timestamp] + values, ensure_ascii=False, separators=(",", ":"))
+        return text.encode("utf-8") + b"\n"
+    #------------------------------------------------------------------------------------------------- 
+    def decode(self, line: bytes) -> Tuple[str, float, Any]:
+        """
+        """
+        kind, timestamp, *values = json_loads(line)
+        if kind == "map":
+            return kind, timestamp, tuple(values)
+
+        data_type = JOURNAL_DATA_TYPES[kind]
+        kwargs = {}
+        for field, value in zip([field for field in fields(data_type) if field.init and field.name != "extra"], values):
+            if field.name in JOURNAL_ENUM_TYPES and value is not None:
+                value = JOURNAL_ENUM_TYPES[field.name](value)
+            elif field.name == "datetime" and value:
+                value = datetime.fromisoformat(value)
+            kwargs[field.name] = value
+        return kind, timestamp, data_type(**kwargs)
+#------------------------------------------------------------------------------------------------- 
+class MexcPacketLogger:
+    """
+    私有频道报文日志
+
+    * 最近PACKET_BUFFER_SIZE条原始报文保存在deque环形缓冲中，供实时查看
+    * 按频道级别和采样间隔过滤后放入队列，由后台线程格式化并写入文件，不占用事件引擎
+    """
+    def __init__(self, gateway_name: str):
+        """
+        """
+        self.gateway_name: str = gateway_name
+        self.buffer: deque = deque(maxlen=PACKET_BUFFER_SIZE)
+        self.counts: Dict[str, int] = {}
+
+        self.logger: logging.Logger = logging.getLogger(f"vnpy_mexc.packet.{gateway_name}")
+        self.logger.propagate = False
+        self.logger.setLevel(PACKET_LOG_LEVELS["禁用"])
+        self.listener: QueueListener = None
+    #------------------------------------------------------------------------------------------------- 
+    def start(self, folder: Path, level: int) -> None:
+        """
+        启动后台写文件线程
+        """
+        self.stop()
+
+        self.logger.setLevel(level)
+        if level > logging.CRITICAL:
+            return
+
+        file_path = folder.joinpath(f"mexc_packet_{self.gateway_name}_{datetime.now():%Y%m%d}.log")
+        file_handler = logging.FileHandler(file_path, encoding="utf-8", delay=True)
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+        queue = SimpleQueue()
+        self.logger.handlers = [MexcQueueHandler(queue)]
+        self.listener = QueueListener(queue, file_handler)
+        self.listener.start()
+    #------------------------------------------------------------------------------------------------- 
+    def stop(self) -> None:
+        """
+        停止后台线程，写完队列中剩余日志
+        """
+        if not self.listener:
+            return
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        self.logger.handlers = []
+    #------------------------------------------------------------------------------------------------- 
+    def log(self, packet: dict) -> None:
+        """
+        记录报文
+        """
+        self.buffer.append(packet)
+
+        channel = packet.get("channel", "")
+        level = PACKET_CHANNEL_LEVELS.get(channel, logging.DEBUG)
+        if not self.listener or not self.logger.isEnabledFor(level):
+            return
+
+        sampling = PACKET_CHANNEL_SAMPLING.get(channel, 1)
+        if sampling > 1:
+            count = self.counts.get(channel, 0)
+            self.counts[channel] = count + 1
+            if count % sampling:
+                return
+
+        self.logger.log(level, "%s", packet)
+    #------------------------------------------------------------------------------------------------- 
+    def get_recent_packets(self, count: int = 100) -> List[dict]:
+        """
+        获取最近count条报文
+        """
+        packets = list(self.buffer)
+        return packets[-count:]
+#------------------------------------------------------------------------------------------------- 
+class MexcQueueHandler(QueueHandler):
+    """
+    不在调用线程格式化日志，交由QueueListener后台线程处理
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        """
+        return record
+#------------------------------------------------------------------------------------------------- 
 class MexcRestApi(RestClient):
     """
     Mexc REST API
@@ -239,9 +1028,19 @@ class MexcRestApi(RestClient):
 
         self.order_count: int = 10000
         self.order_count_lock: Lock = Lock()
+
+        # 浏览器下单接口线程池，每个线程持有一个keep-alive会话
+        self.bridge_executor: ThreadPoolExecutor = ThreadPoolExecutor(BRIDGE_WORKERS)
+        self.bridge_local: local = local()
+        self.submitting_count: int = 0
         self.connect_time: int = 0
 
         self.contract_inited:bool = False
+        self.contract_snapshot: Dict[str, dict] = {}
+
+        self.scheduler: MexcRequestScheduler = MexcRequestScheduler(self)
+        self.cancel_batcher: MexcCancelBatcher = MexcCancelBatcher(self)
+        self.kline_cache: MexcKlineCache = None
     #------------------------------------------------------------------------------------------------- 
     def sign(self, request) -> Request:
         """
@@ -275,25 +1074,71 @@ class MexcRestApi(RestClient):
         key: str,
         secret: str,
         proxy_host: str,
-        proxy_port: int
+        proxy_port: int,
+        kline_cache: bool = True
     ) -> None:
         """
         连接REST服务
         """
         self.key = key
         self.secret = secret
+
+        if kline_cache:
+            self.kline_cache = MexcKlineCache(get_folder_path("mexc_kline_cache"))
         self.connect_time = (
             int(datetime.now().strftime("%y%m%d%H%M%S")) * self.order_count
         )
 
         self.init(REST_HOST, proxy_host, proxy_port)
         self.start()
+        self.scheduler.start()
 
         self.gateway.write_log(f"交易接口：{self.gateway_name}，REST API启动成功")
 
+        # 先用本地快照推送合约，REST查询完成后只推送有变化的合约
+        self.load_contract_snapshot()
         self.query_contract()
         self.query_account()
         self.query_order()
+        self.query_position()
+    #------------------------------------------------------------------------------------------------- 
+    def stop(self) -> None:
+        """
+        """
+        self.scheduler.stop()
+        super().stop()
+    #------------------------------------------------------------------------------------------------- 
+    def add_request(
+        self,
+        method: str,
+        path: str,
+        callback: Callable,
+        params: dict = None,
+        data: Union[dict, list] = None,
+        json: dict = None,
+        headers: dict = None,
+        on_failed: Callable = None,
+        on_error: Callable = None,
+        extra: Any = None,
+    ) -> None:
+        """
+        按接口分组和优先级排队，由调度器限速发送
+        """
+        self.scheduler.put(
+            path,
+            {
+                "method": method,
+                "path": path,
+                "callback": callback,
+                "params": params,
+                "data": data,
+                "json": json,
+                "headers": headers,
+                "on_failed": on_failed,
+                "on_error": on_error,
+                "extra": extra,
+            }
+        )
     #------------------------------------------------------------------------------------------------- 
     def set_leverage(self,symbol:str):
         """
@@ -330,23 +1175,57 @@ class MexcRestApi(RestClient):
         """
         查询合约活动委托单
         """
-        params = {
-            "page_num":1,
-            "page_size":20
-            }
-        self.add_request(
-            method="GET",
-            path="/api/v1/private/order/list/open_orders",
-            callback=self.on_query_order,
-            params=params
-        )
+        MexcPageQuery(
+            self,
+            "/api/v1/private/order/list/open_orders",
+            "orderId",
+            self.on_query_order,
+            "查询活动委托"
+        ).start()
+        MexcPageQuery(
+            self,
+            "/api/v1/private/planorder/list/orders",
+            "id",
+            self.on_query_order_Algo,
+            "查询计划委托"
+        ).start()
+    #------------------------------------------------------------------------------------------------- 
+    def query_position(self) -> None:
+        """
+        查询持仓
+        """
         self.add_request(
             method="GET",
-            path="/api/v1/private/planorder/list/orders",
-            callback=self.on_query_order_Algo,
-            params=params
+            path="/api/v1/private/position/open_positions",
+            callback=self.on_query_position
         )
+    #------------------------------------------------------------------------------------------------- 
+    def on_query_position(self, data: dict, request: Request) -> None:
+        """
+        收到持仓回报，已不存在的本地持仓推送为0
+        """
+        if self.check_error(data, "查询持仓"):
+            return
 
+        positionids = set()
+        for pos_data in data["data"] or []:
+            position = PositionData(
+                symbol = pos_data["symbol"],
+                exchange = Exchange.MEXC,
+                direction = HOLDSIDE_MEXC2VT[pos_data["positionType"]],
+                volume = float(pos_data["holdVol"]),
+                price = float(pos_data["openAvgPrice"]),
+                pnl = float(pos_data["realised"]),
+                gateway_name = self.gateway_name
+            )
+            positionids.add(position.vt_positionid)
+            self.gateway.update_position(position)
+
+        for vt_positionid, position in list(self.gateway.positions.items()):
+            if vt_positionid not in positionids and position.volume:
+                position = copy(position)
+                position.volume = 0
+                self.gateway.update_position(position)
     #------------------------------------------------------------------------------------------------- 
     def query_contract(self) -> Request:
         """
@@ -360,86 +1239,146 @@ class MexcRestApi(RestClient):
             callback=self.on_query_contract,
         )
     #------------------------------------------------------------------------------------------------- 
+    def load_contract_snapshot(self) -> None:
+        """
+        读取本地合约快照
+        """
+        self.contract_snapshot = load_json(CONTRACT_SNAPSHOT_NAME)
+        if not self.contract_snapshot:
+            return
+
+        for contract_data in self.contract_snapshot.values():
+            self.process_contract(contract_data)
+
+        self.gateway.write_log(f"交易接口：{self.gateway_name}，本地合约快照读取成功，合约数量：{len(self.contract_snapshot)}")
+        self.contract_inited = True
+    #------------------------------------------------------------------------------------------------- 
     def query_history(self, req: HistoryRequest) -> List[BarData]:
         """
         查询历史数据
         """
-        history : List[BarData] = []
-        limit: int = 2000
-
+        return self.query_history_frame(req).to_bars()
+    #------------------------------------------------------------------------------------------------- 
+    def query_history_frame(self, req: HistoryRequest) -> "MexcBarFrame":
+        """
+        查询列式历史数据，开启K线缓存时只下载缓存之外的头尾部分
+        """
         start_time: int = int(datetime.timestamp(req.start))
-        stop_time = int(datetime.timestamp(req.end))
-        while True:
-            
-            # 查询K线参数
-            params = {
-                "symbol": req.symbol,
-                "interval": INTERVAL_VT2MEXC[req.interval],
-                "start": start_time,
-            }
+        if req.end:
+            stop_time: int = int(datetime.timestamp(req.end))
+        else:
+            stop_time: int = int(time())
 
-            resp = self.request(
-                "GET",
-                f"/api/v1/contract/kline/{req.symbol}",
-                params=params
-            )
-            
-            # resp为空或收到错误代码则跳出循环
-            if not resp:
-                msg = f"获取历史数据失败，状态码：{resp}"
-                self.gateway.write_log(msg)
-                break
-            elif resp.status_code // 100 != 2:
-                msg = f"获取历史数据失败，状态码：{resp.status_code}，信息：{resp.text}"
-                self.gateway.write_log(msg)
-                break
-            else:
-                rawdata = resp.json()
-                if not rawdata:
-                    msg: str = f"获取历史数据为空，开始时间：{start_time}"
-                    self.gateway.write_log(msg)
-                    break
+        if not self.kline_cache:
+            frame, _ = self.download_history(req, start_time, stop_time)
+            return frame
 
-                buf: List[BarData] = []
-                data=rawdata["data"]
-                for index, _ in enumerate(data["time"]):
+        step: int = int(TIMEDELTA_MAP[req.interval].total_seconds())
 
-                    dt = get_local_datetime(int(data["time"][index]) * 1000)
+        with self.kline_cache.get_lock(req.symbol, req.interval):
+            cached, cache_start, cache_end = self.kline_cache.load(req, self.gateway_name)
 
-                    bar = BarData(
-                        symbol=req.symbol,
-                        exchange=req.exchange,
-                        datetime=dt,
-                        interval=req.interval,
-                        volume=float(data["vol"][index]),
-                        open_price=float(data["open"][index]),
-                        high_price=float(data["high"][index]),
-                        low_price=float(data["low"][index]),
-                        close_price=float(data["close"][index]),
-                        gateway_name=self.gateway_name
-                    )
-                    buf.append(bar)
+            if not len(cached):
+                frame, complete = self.download_history(req, start_time, stop_time)
+                cache_start, cache_end = start_time, stop_time
+            else:
+                # 新下载的数据放在前面，覆盖缓存中未完成的最后一根K线
+                frames: List[MexcBarFrame] = []
+                complete = True
+                if start_time < cache_start:
+                    head, head_complete = self.download_history(req, start_time, cache_start)
+                    frames.append(head)
+                    complete = complete and head_complete
+                    cache_start = start_time
+                if stop_time > cache_end - step:
+                    tail, tail_complete = self.download_history(req, cache_end - step, stop_time)
+                    frames.append(tail)
+                    complete = complete and tail_complete
+                    cache_end = max(cache_end, stop_time)
+
+                if not frames:
+                    return cached.slice(start_time, stop_time)
+
+                frames.append(cached)
+                frame = MexcBarFrame.concat(req, self.gateway_name, frames)
+
+            # 有分段下载失败时不写缓存，避免把缺失的K线当作已覆盖
+            if complete:
+                self.kline_cache.save(frame, cache_start, min(cache_end, int(time())))
+
+        return frame.slice(start_time, stop_time)
+    #------------------------------------------------------------------------------------------------- 
+    def download_history(self, req: HistoryRequest, start_time: int, stop_time: int) -> Tuple["MexcBarFrame", bool]:
+        """
+        按单次查询上限切分时间段后并发下载K线，返回(K线，是否全部分段下载成功)
+        """
+        step: int = int(TIMEDELTA_MAP[req.interval].total_seconds())
 
-                history.extend(buf)
-                
-                begin_time: datetime = buf[0].datetime
-                end_time: datetime = buf[-1].datetime
+        ranges: List[Tuple[int, int]] = []
+        range_start: int = start_time
+        while range_start <= stop_time:
+            range_end = min(range_start + (HISTORY_LIMIT - 1) * step, stop_time)
+            ranges.append((range_start, range_end))
+            range_start = range_end + step
 
-                msg: str = f"获取历史数据成功，{req.symbol} - {req.interval.value}，{begin_time} - {end_time}"
-                self.gateway.write_log(msg)
+        with ThreadPoolExecutor(max_workers=HISTORY_WORKERS) as executor:
+            results = list(executor.map(lambda time_range: self.query_history_range(req, *time_range), ranges))
 
-                
-                # 如果收到了最后一批数据则终止循环
-                if len(data["time"]) < limit:
-                    break
+        # 按时间合并去重
+        frame = MexcBarFrame.concat(req, self.gateway_name, [frame for frame, _ in results])
+        complete = all(success for _, success in results)
+        return frame.slice(start_time, stop_time), complete
+    #------------------------------------------------------------------------------------------------- 
+    def query_history_range(self, req: HistoryRequest, start_time: int, end_time: int) -> Tuple["MexcBarFrame", bool]:
+        """
+        查询单个时间段的K线，返回(K线，是否查询成功)
+
+        请求失败或返回错误时查询失败；请求成功但该时间段没有K线(如上市前)视为成功
+        """
+        frame = MexcBarFrame(req, self.gateway_name)
+
+        # 查询K线参数
+        params = {
+            "symbol": req.symbol,
+            "interval": INTERVAL_VT2MEXC[req.interval],
+            "start": start_time,
+            "end": end_time,
+        }
 
-                #if start_time>stop_time:
-                #    break
+        self.scheduler.buckets["market"].acquire()
+        resp = self.request(
+            "GET",
+            f"/api/v1/contract/kline/{req.symbol}",
+            params=params
+        )
 
-                # 更新开始时间
-                start_dt = bar.datetime + TIMEDELTA_MAP[req.interval]
-                start_time = int(datetime.timestamp(start_dt))
-        return history
+        if not resp:
+            msg = f"获取历史数据失败，状态码：{resp}"
+            self.gateway.write_log(msg)
+            return frame, False
+        elif resp.status_code // 100 != 2:
+            msg = f"获取历史数据失败，状态码：{resp.status_code}，信息：{resp.text}"
+            self.gateway.write_log(msg)
+            return frame, False
+
+        rawdata = resp.json()
+        if not rawdata or not rawdata.get("success", False) or not rawdata.get("data", None):
+            msg: str = f"获取历史数据失败，开始时间：{start_time}，信息：{rawdata}"
+            self.gateway.write_log(msg)
+            return frame, False
+        elif not rawdata["data"]["time"]:
+            msg: str = f"获取历史数据为空，开始时间：{start_time}"
+            self.gateway.write_log(msg)
+            return frame, True
+
+        frame = MexcBarFrame.from_kline_data(req, self.gateway_name, rawdata["data"])
+
+        begin_time: datetime = get_local_datetime(int(frame.timestamps[0]) * 1000)
+        end_time: datetime = get_local_datetime(int(frame.timestamps[-1]) * 1000)
+
+        msg: str = f"获取历史数据成功，{req.symbol} - {req.interval.value}，{begin_time} - {end_time}"
+        self.gateway.write_log(msg)
+        return frame, True
     #------------------------------------------------------------------------------------------------- 
     def new_local_orderid(self) -> str:
         """
@@ -452,16 +1391,156 @@ class MexcRestApi(RestClient):
     #------------------------------------------------------------------------------------------------- 
     def send_order(self, req: OrderRequest) -> str:
         """
-        发送委托单
+        发送委托单，立即返回SUBMITTING状态的本地委托，由后台线程调用浏览器下单接口
         """
-        #api不可用
-        rest_host="http://localhost:5102"
-        DIRECTION2STR = {
-            Direction.LONG:"long",
-            Direction.SHORT:"short"
-        }
-        #local_orderid =req.symbol + "-" + self.new_local_orderid()
-        
+        local_orderid = self.new_local_orderid()
+        order = req.create_order_data(
+            local_orderid,
+            self.gateway_name
+        )
+        self.gateway.on_order(order)
+
+        # 与hold_order_push使用同一把锁，保证判断是否暂存推送时计数与委托号映射一致
+        with self.gateway.orderid_lock:
+            self.submitting_count += 1
+        self.bridge_executor.submit(self.send_bridge_order, req, copy(order))
+        return order.vt_orderid
+    #------------------------------------------------------------------------------------------------- 
+    def get_bridge_session(self) -> requests.Session:
+        """
+        获取当前线程的浏览器下单接口会话，复用keep-alive连接
+        """
+        session = getattr(self.bridge_local, "session", None)
+        if not session:
+            session = requests.Session()
+            self.bridge_local.session = session
+        return session
+    #------------------------------------------------------------------------------------------------- 
+    def send_bridge_order(self, req: OrderRequest, order: OrderData) -> None:
+        """
+        调用浏览器下单接口，收到交易所委托号后更新委托状态
+        """
+        send_time = time()
+        orderid, unknown = None, False
+        try:
+            orderid, unknown = self.post_bridge_order(req)
+        except Exception as e:
+            self.gateway.write_log(f"浏览器下单接口请求出错，本地委托号：{order.orderid}，错误：{repr(e)}")
+
+        if unknown:
+            # 已点击下单但没有拿到响应，委托可能已提交，保持提交中状态，查询委托确认后再处理
+            self.gateway.write_log(f"浏览器下单结果未知，本地委托号：{order.orderid}，查询委托确认")
+            self.query_unknown_order(req, order, send_time)
+            return
+
+        if not orderid:
+            self.reject_bridge_order(order, f"委托失败，浏览器下单接口未返回委托号，本地委托号：{order.orderid}")
+        else:
+            order.status = Status.NOTTRADED
+            self.gateway.on_order(order)
+            self.gateway.map_orderid(order.orderid, str(orderid))
+        self.finish_bridge_order()
+    #------------------------------------------------------------------------------------------------- 
+    def reject_bridge_order(self, order: OrderData, msg: str) -> None:
+        """
+        委托未提交成功，丢弃提交期间收到的撤单
+        """
+        self.gateway.pending_cancels.pop(order.orderid, None)
+        order.status = Status.REJECTED
+        self.gateway.on_order(order)
+        self.gateway.write_log(msg)
+        self.cancel_all()
+    #------------------------------------------------------------------------------------------------- 
+    def finish_bridge_order(self) -> None:
+        """
+        拿到委托号映射后再减少提交中计数，期间到达的推送都会被暂存
+        """
+        with self.gateway.orderid_lock:
+            self.submitting_count -= 1
+        self.gateway.release_order_pushes()
+    #------------------------------------------------------------------------------------------------- 
+    def query_unknown_order(self, req: OrderRequest, order: OrderData, send_time: float) -> None:
+        """
+        查询下单期间该合约的委托，确认浏览器下单结果未知的委托是否已提交
+        """
+        if req.type == OrderType.STOP:
+            path, key, parse = "/api/v1/private/planorder/list/orders", "id", self.parse_algo_order_data
+        else:
+            path, key, parse = "/api/v1/private/order/list/history_orders", "orderId", self.parse_order_data
+
+        MexcPageQuery(
+            self,
+            path,
+            key,
+            lambda data: self.on_query_unknown_order(data, order, key, parse),
+            "查询结果未知委托",
+            params={
+                "symbol": req.symbol,
+                "start_time": int(send_time * 1000) - BRIDGE_TIME_TOLERANCE,
+                "end_time": int(time() * 1000) + BRIDGE_TIME_TOLERANCE
+            }
+        ).start()
+    #------------------------------------------------------------------------------------------------- 
+    def on_query_unknown_order(
+        self,
+        data: List[dict],
+        order: OrderData,
+        key: str,
+        parse: Callable[[dict], OrderData]
+    ) -> None:
+        """
+        按合约、方向、数量和价格匹配最早的未映射委托，找到则记录委托号，否则视为下单失败
+        """
+        for order_data in sorted(data, key=lambda order_data: order_data["createTime"]):
+            sys_orderid = str(order_data[key])
+            if sys_orderid in self.gateway.sys_local_map:
+                continue
+
+            result = parse(order_data)
+            if (
+                result.symbol != order.symbol
+                or result.direction != order.direction
+                or result.volume != order.volume
+                or (order.type != OrderType.MARKET and result.price != order.price)
+            ):
+                continue
+
+            self.gateway.map_orderid(order.orderid, sys_orderid)
+            self.gateway.write_log(f"查询到结果未知的委托，本地委托号：{order.orderid}，交易所委托号：{sys_orderid}")
+            result.orderid = order.orderid
+            self.gateway.update_order(result)
+            break
+        else:
+            self.reject_bridge_order(order, f"委托失败，未查询到浏览器下单结果未知的委托，本地委托号：{order.orderid}")
+        self.finish_bridge_order()
+    #------------------------------------------------------------------------------------------------- 
+    def post_bridge(self, session: requests.Session, method: str, data: dict) -> Union[dict, None]:
+        """
+        发送浏览器下单请求，返回下单接口响应
+
+        连接失败时委托没有发出，直接抛出异常；请求发出后超时或连接中断时，
+        下单接口可能仍在排队或执行，返回None表示下单结果未知
+        """
+        try:
+            response = session.post(f"{BRIDGE_HOST}/{method}", json=data, timeout=BRIDGE_TIMEOUT)
+        except requests.RequestException as e:
+            if is_connect_error(e):
+                raise
+            self.gateway.write_log(f"浏览器下单接口请求已发出但没有收到响应，错误：{repr(e)}")
+            return None
+        return json.loads(response.json())
+    #------------------------------------------------------------------------------------------------- 
+    def post_bridge_order(self, req: OrderRequest) -> Tuple[str, bool]:
+        """
+        发送浏览器下单请求，返回(交易所委托号，下单结果是否未知)
+        """
+        #api不可用
+        DIRECTION2STR = {
+            Direction.LONG:"long",
+            Direction.SHORT:"short"
+        }
+        session = self.get_bridge_session()
+
         if req.type==OrderType.STOP:
             '''
             data = {
@@ -492,27 +1571,23 @@ class MexcRestApi(RestClient):
             'trigger_price': float(req.price),
             'quantity': float(req.volume),
             'take_profit_price': tp,
-            'stop_loss_price': sl
+            'stop_loss_price': sl,
+            'symbol': req.symbol
             }
-            response=requests.post(f'{rest_host}/place_stop_order', json=data)
-            try:
-                res=json.loads(response.json())
-                orderid=res["data"]
-            except:
-                self.cancel_all()
-                return False
+            res=self.post_bridge(session, 'place_stop_order', data)
+            if res is None or res.get("unknown", False):
+                return None, True
+            orderid=res["data"]
         elif req.type == OrderType.MARKET:
             data = {
             'direction': DIRECTION2STR[req.direction],
-            'quantity': float(req.volume)
+            'quantity': float(req.volume),
+            'symbol': req.symbol
             }
-            response=requests.post(f'{rest_host}/place_market_order', json=data)
-            try:
-                res=json.loads(response.json())
-                orderid=res["data"]["orderId"]
-            except:
-                self.cancel_all()
-                return False
+            res=self.post_bridge(session, 'place_market_order', data)
+            if res is None or res.get("unknown", False):
+                return None, True
+            orderid=res["data"]["orderId"]
         else:
             '''
             data = {
@@ -540,57 +1615,57 @@ class MexcRestApi(RestClient):
             data = {
             'direction': DIRECTION2STR[req.direction],
             'price': float(req.price),
-            'quantity': float(req.volume)
+            'quantity': float(req.volume),
+            'symbol': req.symbol
             }
-            response=requests.post(f'{rest_host}/place_limit_order', json=data)
-            try:
-                res=json.loads(response.json())
-                orderid=res["data"]["orderId"]
-            except:
-                self.cancel_all()
-                return False
-        order = req.create_order_data(
-            orderid,
-            self.gateway_name
-        )
-        print(orderid)
-        self.gateway.on_order(order)
-        return order.vt_orderid
+            res=self.post_bridge(session, 'place_limit_order', data)
+            if res is None or res.get("unknown", False):
+                return None, True
+            orderid=res["data"]["orderId"]
+        return orderid, False
     #------------------------------------------------------------------------------------------------- 
     def cancel_order(self, req: CancelRequest) -> Request:
         """
         取消委托单
         """
         order: OrderData = self.gateway.get_order(req.orderid)
+
+        # 还未收到交易所委托号，等下单接口返回后再撤单
+        sys_orderid = self.gateway.get_sys_orderid(req.orderid)
+        if not sys_orderid:
+            self.gateway.pending_cancels[req.orderid] = req
+            return
+
+        # 撤单请求在短时间窗口内合并后批量发送
+        self.cancel_batcher.add(order, sys_orderid)
+    #------------------------------------------------------------------------------------------------- 
+    def send_cancel_batch(self, orders: List[OrderData], sys_orderids: List[str], plan: bool) -> None:
+        """
+        批量撤单，extra中保存交易所委托号到委托的映射
+        """
         #计划委托单撤单
-        if order.type==OrderType.STOP:
+        if plan:
             data = [
                 {
-                    "symbol" : req.symbol,
-                    "orderId" : req.orderid
+                    "symbol" : order.symbol,
+                    "orderId" : sys_orderid
                 }
+                for order, sys_orderid in zip(orders, sys_orderids)
             ]
-            self.add_request(
-                method="POST",
-                path="/api/v1/private/planorder/cancel",
-                callback=self.on_cancel_order,
-                on_failed=self.on_cancel_order_failed,
-                data=data,
-                extra=order
-            )
+            path = "/api/v1/private/planorder/cancel"
         #普通委托单撤单
         else:
-            data = [
-                int(req.orderid)
-            ]
-            self.add_request(
-                method="POST",
-                path="/api/v1/private/order/cancel",
-                callback=self.on_cancel_order,
-                on_failed=self.on_cancel_order_failed,
-                data=data,
-                extra=order
-            )
+            data = [int(sys_orderid) for sys_orderid in sys_orderids]
+            path = "/api/v1/private/order/cancel"
+
+        self.add_request(
+            method="POST",
+            path=path,
+            callback=self.on_cancel_orders,
+            on_failed=self.on_cancel_orders_failed,
+            data=data,
+            extra=dict(zip(sys_orderids, orders))
+        )
     def cancel_all(self) -> Request:
         """
         取消全部委托单
@@ -630,103 +1705,183 @@ class MexcRestApi(RestClient):
                 gateway_name=self.gateway_name,
             )
             if account.balance:
-                self.gateway.on_account(account)
-                
+                self.gateway.update_account(account)
         self.gateway.write_log("账户资金查询成功")
-
     #------------------------------------------------------------------------------------------------- 
-    def on_query_order(self, data: dict, request: Request) -> None:
+    def on_query_order(self, data: List[dict]) -> None:
         """
-        收到委托回报
+        收到全部分页的委托回报
         """
-
-        if self.check_error(data, "查询活动委托"):
-            return
-        data = data["data"]
-        if not data:
-            return
+        open_orderids = set()
         for order_data in data:
-            order_datetime =  get_local_datetime(int(order_data["createTime"]))
-
-            order = OrderData(
-                orderid=order_data["orderId"],
-                symbol=order_data["symbol"],
-                exchange=Exchange.MEXC,
-                price=order_data["price"],
-                volume=order_data["vol"],
-                type=ORDERTYPE_MEXC2VT[order_data["orderType"]],
-                direction=DIRECTION_MEXC2VT[order_data["side"]],
-                traded=float(order_data["dealVol"]),
-                status=STATUS_MEXC2VT[order_data["state"]],
-                datetime= order_datetime,
-                gateway_name=self.gateway_name,
-            )
-
-            self.gateway.on_order(order)
-
+            order = self.parse_order_data(order_data)
+            open_orderids.add(order.orderid)
+            self.gateway.update_order(order)
+
+        # 本地仍为活动状态但已不在活动委托中的普通委托，查询最终状态
+        for order in self.gateway.orders.get_active_orders():
+            if (
+                order.status != Status.SUBMITTING
+                and order.type != OrderType.STOP
+                and order.orderid not in open_orderids
+            ):
+                self.query_order_detail(order.orderid)
         self.gateway.write_log("当前委托信息查询成功")
-    def on_query_order_Algo(self, data: dict, request: Request) -> None:
+    #------------------------------------------------------------------------------------------------- 
+    def query_order_detail(self, orderid: str) -> None:
         """
-        收到委托回报
+        查询单个委托
         """
-
-        if self.check_error(data, "查询活动委托"):
-            return
-        data = data["data"]
-        if not data:
+        self.add_request(
+            method="GET",
+            path=f"/api/v1/private/order/get/{self.gateway.get_sys_orderid(orderid)}",
+            callback=self.on_query_order_detail
+        )
+    #------------------------------------------------------------------------------------------------- 
+    def on_query_order_detail(self, data: dict, request: Request) -> None:
+        """
+        收到单个委托回报
+        """
+        if self.check_error(data, "查询委托"):
             return
-        for order_data in data:
-            order_datetime =  get_local_datetime(int(order_data["createTime"]))
-
-            order = OrderData(
-                orderid=order_data["id"],
-                symbol=order_data["symbol"],
-                exchange=Exchange.MEXC,
-                price=order_data["triggerPrice"],
-                volume=order_data["vol"],
-                type=OrderType.STOP,
-                direction=DIRECTION_MEXC2VT[order_data["side"]],
-                traded=0.0,
-                status=PLANSTATUS_MEXC2VT[order_data["state"]],
-                datetime= order_datetime,
-                gateway_name=self.gateway_name,
-            )
-            self.gateway.on_order(order)
+        if data["data"]:
+            self.gateway.update_order(self.parse_order_data(data["data"]))
+    #------------------------------------------------------------------------------------------------- 
+    def parse_order_data(self, order_data: dict) -> OrderData:
+        """
+        REST委托数据转换为OrderData
+        """
+        order_datetime =  get_local_datetime(int(order_data["createTime"]))
 
+        order = OrderData(
+            orderid=self.gateway.get_local_orderid(str(order_data["orderId"])),
+            symbol=order_data["symbol"],
+            exchange=Exchange.MEXC,
+            price=float(order_data["price"]),
+            volume=float(order_data["vol"]),
+            type=ORDERTYPE_MEXC2VT[order_data["orderType"]],
+            direction=DIRECTION_MEXC2VT[order_data["side"]],
+            traded=float(order_data["dealVol"]),
+            status=STATUS_MEXC2VT[order_data["state"]],
+            datetime= order_datetime,
+            gateway_name=self.gateway_name,
+        )
+        return order
+    #------------------------------------------------------------------------------------------------- 
+    def on_query_order_Algo(self, data: List[dict]) -> None:
+        """
+        收到全部分页的计划委托回报
+        """
+        plan_orderids = set()
+        for order_data in data:
+            order = self.parse_algo_order_data(order_data)
+            plan_orderids.add(order.orderid)
+            self.gateway.update_order(order)
+
+        # 本地仍为活动状态但已不在计划委托中的计划委托，查询历史计划委托中的最终状态
+        missing_orderids = set()
+        for order in self.gateway.orders.get_active_orders():
+            if (
+                order.status != Status.SUBMITTING
+                and order.type == OrderType.STOP
+                and order.orderid not in plan_orderids
+            ):
+                missing_orderids.add(order.orderid)
+        if missing_orderids:
+            self.query_order_Algo_history(missing_orderids)
         self.gateway.write_log("计划委托信息查询成功")
     #------------------------------------------------------------------------------------------------- 
+    def query_order_Algo_history(self, orderids: set) -> None:
+        """
+        查询已结束的计划委托(已取消、已执行、已失效、触发失败)
+        """
+        MexcPageQuery(
+            self,
+            "/api/v1/private/planorder/list/orders",
+            "id",
+            lambda data: self.on_query_order_Algo_history(data, orderids),
+            "查询历史计划委托",
+            params={"states": "2,3,4,5"}
+        ).start()
+    #------------------------------------------------------------------------------------------------- 
+    def on_query_order_Algo_history(self, data: List[dict], orderids: set) -> None:
+        """
+        收到历史计划委托回报，只更新待确认最终状态的委托
+        """
+        for order_data in data:
+            order = self.parse_algo_order_data(order_data)
+            if order.orderid in orderids:
+                self.gateway.update_order(order)
+    #------------------------------------------------------------------------------------------------- 
+    def parse_algo_order_data(self, order_data: dict) -> OrderData:
+        """
+        REST计划委托数据转换为OrderData
+        """
+        order_datetime =  get_local_datetime(int(order_data["createTime"]))
+
+        order = OrderData(
+            orderid=self.gateway.get_local_orderid(str(order_data["id"])),
+            symbol=order_data["symbol"],
+            exchange=Exchange.MEXC,
+            price=float(order_data["triggerPrice"]),
+            volume=float(order_data["vol"]),
+            type=OrderType.STOP,
+            direction=DIRECTION_MEXC2VT[order_data["side"]],
+            traded=0.0,
+            status=PLANSTATUS_MEXC2VT[order_data["state"]],
+            datetime= order_datetime,
+            gateway_name=self.gateway_name,
+        )
+        return order
+    #------------------------------------------------------------------------------------------------- 
     def on_query_contract(self, data: dict, request: Request) -> None:
         """
         收到合约参数回报
         """
         if self.check_error(data, "查询合约"):
             return
-        for contract_data in data["data"]:
-            price_place = contract_data["priceScale"]
-            contract = ContractData(
-                symbol=contract_data["symbol"],
-                exchange=Exchange.MEXC,
-                name=contract_data["displayName"],
-                #pricetick=float(contract_data["priceUnit"]) * float(f"1e-{price_place}"),
-                pricetick=float(contract_data["priceUnit"]),
-                size=20,    # 合约杠杆
-                min_volume=float(contract_data["minVol"]) * float(contract_data["priceUnit"]),
-                product=Product.FUTURES,
-                net_position=True,
-                history_data=True,
-                gateway_name=self.gateway_name,
-                stop_supported=True
-            )
 
-            self.gateway.on_contract(contract)
+        snapshot: Dict[str, dict] = {}
+        changed: int = 0
+        for contract_data in data["data"]:
+            symbol = contract_data["symbol"]
+            snapshot[symbol] = contract_data
 
-            symbol_contract_map[contract.symbol] = contract
+            if self.contract_snapshot.get(symbol, None) != contract_data:
+                self.process_contract(contract_data)
+                changed += 1
 
+        self.contract_snapshot = snapshot
+        save_json(CONTRACT_SNAPSHOT_NAME, snapshot)
 
         product_type = contract_data["quoteCoin"]
-        self.gateway.write_log(f"交易接口：{self.gateway_name}，{product_type}合约信息查询成功")
+        self.gateway.write_log(f"交易接口：{self.gateway_name}，{product_type}合约信息查询成功，更新合约数量：{changed}")
         self.contract_inited = True
     #------------------------------------------------------------------------------------------------- 
+    def process_contract(self, contract_data: dict) -> None:
+        """
+        生成并推送合约数据
+        """
+        price_place = contract_data["priceScale"]
+        contract = ContractData(
+            symbol=contract_data["symbol"],
+            exchange=Exchange.MEXC,
+            name=contract_data["displayName"],
+            #pricetick=float(contract_data["priceUnit"]) * float(f"1e-{price_place}"),
+            pricetick=float(contract_data["priceUnit"]),
+            size=20,    # 合约杠杆
+            min_volume=float(contract_data["minVol"]) * float(contract_data["priceUnit"]),
+            product=Product.FUTURES,
+            net_position=True,
+            history_data=True,
+            gateway_name=self.gateway_name,
+            stop_supported=True
+        )
+
+        self.gateway.on_contract(contract)
+
+        symbol_contract_map[contract.symbol] = contract
+    #------------------------------------------------------------------------------------------------- 
     def on_send_order(self, data: dict, request: Request) -> None:
         """
         """
@@ -770,6 +1925,54 @@ class MexcRestApi(RestClient):
         """
         self.check_error(data, "撤单")
     #------------------------------------------------------------------------------------------------- 
+    def on_cancel_orders(self, data: dict, request: Request) -> None:
+        """
+        收到批量撤单回报，逐个委托检查撤单结果
+        """
+        if self.check_error(data, "撤单"):
+            return
+
+        results = data.get("data", None)
+        if not isinstance(results, list):
+            return
+
+        orders: Dict[str, OrderData] = request.extra
+        for result in results:
+            if not result.get("errorCode", 0):
+                continue
+
+            sys_orderid = str(result["orderId"])
+            order = orders.get(sys_orderid, None)
+            if not order:
+                orderid = self.gateway.get_local_orderid(sys_orderid)
+                self.gateway.write_log(f"撤单失败，委托号：{orderid}，代码：{result['errorCode']}，信息：{result.get('errorMsg', '')}")
+                continue
+
+            # 撤单错误写入委托的extra后重新推送
+            order = copy(self.gateway.get_order(order.orderid) or order)
+            order.extra = {
+                "cancel_error_code": result["errorCode"],
+                "cancel_error_msg": result.get("errorMsg", "")
+            }
+            self.gateway.on_order(order)
+            self.gateway.write_log(f"撤单失败，委托号：{order.vt_orderid}，代码：{result['errorCode']}，信息：{result.get('errorMsg', '')}")
+    #------------------------------------------------------------------------------------------------- 
+    def on_cancel_orders_failed(self, status_code: int, request: Request) -> None:
+        """
+        批量撤单请求失败，撤单失败不改变委托状态，重新查询这些委托的最新状态
+        """
+        msg = f"撤单失败，状态码：{status_code}，委托数量：{len(request.extra)}，信息：{request.response.text}"
+        self.gateway.write_log(msg)
+
+        plan_orderids = set()
+        for order in request.extra.values():
+            if order.type == OrderType.STOP:
+                plan_orderids.add(order.orderid)
+            else:
+                self.query_order_detail(order.orderid)
+        if plan_orderids:
+            self.query_order_Algo_history(plan_orderids)
+    #------------------------------------------------------------------------------------------------- 
     def on_cancel_order_failed(
         self,
         status_code,
@@ -814,255 +2017,1587 @@ class MexcRestApi(RestClient):
         return True
 
 #------------------------------------------------------------------------------------------------- 
-class MexcWebsocketApiBase(WebsocketClient):
-    """
+class MexcCancelBatcher:
     """
+    撤单合并器
 
-    def __init__(self, gateway):
+    * 第一笔撤单到达后等待CANCEL_BATCH_WINDOW秒，或攒满CANCEL_BATCH_SIZE笔后立即发送
+    * 普通委托和计划委托分别合并为一个批量撤单请求
+    """
+    def __init__(self, rest_api: MexcRestApi):
         """
         """
-        super(MexcWebsocketApiBase, self).__init__()
-
-        self.gateway: MexcGateway = gateway
-        self.gateway_name: str = gateway.gateway_name
-
-        self.key: str = ""
-        self.secret: str = ""
-        self.passphrase: str = ""
-        self.count = 0
+        self.rest_api: MexcRestApi = rest_api
 
-    def send_packet(self, packet: dict):
+        self.orders: List[Tuple[OrderData, str]] = []
+        self.plan_orders: List[Tuple[OrderData, str]] = []
+        self.timer: Timer = None
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def add(self, order: OrderData, sys_orderid: str) -> None:
         """
-        发送数据包字典到服务器。
-
-        如果需要发送非json数据，请重载实现本函数。
+        添加待撤委托
         """
-        if self._ws:
-            if packet in ["pong","ping"]:
-                text = packet
+        with self.lock:
+            if order.type == OrderType.STOP:
+                buffer = self.plan_orders
             else:
-                text: str = json.dumps(packet)
-            self._record_last_sent_text(text)
+                buffer = self.orders
+            buffer.append((order, sys_orderid))
 
-            coro: coroutine = self._ws.send_str(text)
-            run_coroutine_threadsafe(coro, self._loop)
-    def unpack_data(self, data: str):
-        """
-        对字符串数据进行json格式解包
+            full = len(buffer) >= CANCEL_BATCH_SIZE
+            if not full and not self.timer:
+                self.timer = Timer(CANCEL_BATCH_WINDOW, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
 
-        如果需要使用json以外的解包格式，请重载实现本函数。
-        """
-        if data in ["pong","ping"]:
-            return data
-        else:
-            return json.loads(data)
+        if full:
+            self.flush()
     #------------------------------------------------------------------------------------------------- 
-    def connect(
+    def flush(self) -> None:
+        """
+        发送全部待撤委托
+        """
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+            orders = self.orders
+            plan_orders = self.plan_orders
+            self.orders = []
+            self.plan_orders = []
+
+        for buffer, plan in [(orders, False), (plan_orders, True)]:
+            for i in range(0, len(buffer), CANCEL_BATCH_SIZE):
+                batch = buffer[i: i + CANCEL_BATCH_SIZE]
+                self.rest_api.send_cancel_batch(
+                    [order for order, _ in batch],
+                    [sys_orderid for _, sys_orderid in batch],
+                    plan
+                )
+#------------------------------------------------------------------------------------------------- 
+class MexcPageQuery:
+    """
+    并发分页查询
+
+    * 先查询第一页，回报中带总页数时并发查询剩余全部页
+    * 不带总页数时，最后一页满页则并发查询后续ORDER_PAGE_BATCH页，直到出现不满页
+    * 全部页返回后按页码合并、按key字段去重，一次性回调
+    """
+    def __init__(
         self,
+        rest_api: MexcRestApi,
+        path: str,
         key: str,
-        secret: str,
-        url: str,
-        proxy_host: str,
-        proxy_port: int
-    ) -> None:
+        callback: Callable[[List[dict]], None],
+        name: str,
+        params: dict = None
+    ):
         """
+        params为分页参数之外的查询参数
         """
-        self.key = key
-        self.secret = secret
+        self.rest_api: MexcRestApi = rest_api
+        self.path: str = path
+        self.key: str = key
+        self.callback: Callable[[List[dict]], None] = callback
+        self.name: str = name
+        self.params: dict = params or {}
 
-        self.init(url, proxy_host, proxy_port)
-        self.start()
-        self.gateway.event_engine.register(EVENT_TIMER,self.send_ping)
-    #------------------------------------------------------------------------------------------------- 
-    def send_ping(self,event):
-        self.count +=1
-        if self.count < 15:
-            return
-        self.count = 0
-        message={
-            "method": "ping"
-        }
-        self.send_packet(message)
+        self.pages: Dict[int, List[dict]] = {}
+        self.pending: set = set()
+        self.max_page: int = 0
+        self.finished: bool = False
+        self.lock: Lock = Lock()
     #------------------------------------------------------------------------------------------------- 
-    def login(self) -> int:
+    def start(self) -> None:
         """
         """
-        timestamp = str(int(time()))
-
-        #message = self.key+ 'GET' + timestamp
-        message = self.key + timestamp
-        signature = create_signature(self.secret,message)
-        params = {
-            "method":"login",
-            "param":{
-                "apiKey":self.key,
-                "reqTime":timestamp,
-                "signature":signature
-            }
-        }
-        return self.send_packet(params)
+        self.request_pages(self.reserve_pages(1, 1))
     #------------------------------------------------------------------------------------------------- 
-    def on_login(self, packet) -> None:
+    def reserve_pages(self, start: int, end: int) -> List[int]:
         """
+        登记待查询的[start, end]页，需要在锁内调用
         """
-        pass
+        pages = list(range(start, end + 1))
+        self.pending.update(pages)
+        self.max_page = max(self.max_page, end)
+        return pages
     #------------------------------------------------------------------------------------------------- 
-    def on_data(self, packet):
-        pass
+    def request_pages(self, pages: List[int]) -> None:
+        """
+        发送分页查询
+        """
+        for page in pages:
+            self.rest_api.add_request(
+                method="GET",
+                path=self.path,
+                callback=self.on_page,
+                on_failed=self.on_page_failed,
+                on_error=self.on_page_error,
+                params={
+                    **self.params,
+                    "page_num": page,
+                    "page_size": ORDER_PAGE_SIZE
+                },
+                extra=page
+            )
     #------------------------------------------------------------------------------------------------- 
-    def on_packet(self, packet:Union[str,dict]) -> None:
+    def on_page(self, data: dict, request: Request) -> None:
         """
+        收到单页回报
         """
-        if packet["channel"] == "pong":
+        page = request.extra
+
+        if self.rest_api.check_error(data, self.name):
+            self.finish_page(page, [])
             return
-        if packet["channel"] == "rs.login" and packet["data"] == "success":
-            self.on_login()
-        elif packet["channel"] == "rs.error":
-            self.on_error_msg(packet)
+
+        page_data = data["data"]
+        total_page = 0
+        if isinstance(page_data, dict):
+            records = page_data.get("resultList", None) or []
+            total_page = int(page_data.get("totalPage", 0))
         else:
-            self.on_data(packet)
+            records = page_data or []
+
+        pages: List[int] = []
+        with self.lock:
+            if total_page:
+                if total_page > self.max_page:
+                    pages = self.reserve_pages(self.max_page + 1, total_page)
+            elif len(records) >= ORDER_PAGE_SIZE and page == self.max_page:
+                pages = self.reserve_pages(page + 1, page + ORDER_PAGE_BATCH)
+
+        self.request_pages(pages)
+        self.finish_page(page, records)
     #------------------------------------------------------------------------------------------------- 
-    def on_error_msg(self, packet) -> None:
-        """
-        """
-        msg = packet["data"]
-        self.gateway.write_log(f"交易接口：{self.gateway_name} WebSocket API收到错误回报，回报信息：{msg}")
-#------------------------------------------------------------------------------------------------- 
-class MexcDataWebsocketApi(MexcWebsocketApiBase):
-    """
-    """
-
-    def __init__(self, gateway: MexcGateway):
+    def on_page_failed(self, status_code: int, request: Request) -> None:
         """
         """
-        super().__init__(gateway)
+        self.rest_api.gateway.write_log(f"{self.name}第{request.extra}页失败，状态码：{status_code}，信息：{request.response.text}")
+        self.finish_page(request.extra, [])
+    #------------------------------------------------------------------------------------------------- 
+    def on_page_error(
+        self,
+        exception_type: type,
+        exception_value: Exception,
+        tb,
+        request: Request
+    ) -> None:
+        """
+        """
+        self.rest_api.on_error(exception_type, exception_value, tb, request)
+        self.finish_page(request.extra, [])
+    #------------------------------------------------------------------------------------------------- 
+    def finish_page(self, page: int, records: List[dict]) -> None:
+        """
+        记录单页结果，全部完成后回调
+        """
+        with self.lock:
+            self.pages[page] = records
+            self.pending.discard(page)
+
+            if self.pending or self.finished:
+                return
+            self.finished = True
+
+        merged: Dict[Any, dict] = {}
+        for page in sorted(self.pages):
+            for record in self.pages[page]:
+                merged[record[self.key]] = record
+
+        self.callback(list(merged.values()))
+#------------------------------------------------------------------------------------------------- 
+class MexcBarFrame:
+    """
+    列式K线数据
+
+    * 时间戳(秒)和OHLCV分别保存为numpy数组
+    * 调用to_bars时才逐行生成BarData
+    """
+    def __init__(self, req: HistoryRequest, gateway_name: str):
+        """
+        """
+        self.symbol: str = req.symbol
+        self.exchange: Exchange = req.exchange
+        self.interval: Interval = req.interval
+        self.gateway_name: str = gateway_name
+
+        self.timestamps: np.ndarray = np.empty(0, dtype=np.int64)
+        self.open_price: np.ndarray = np.empty(0)
+        self.high_price: np.ndarray = np.empty(0)
+        self.low_price: np.ndarray = np.empty(0)
+        self.close_price: np.ndarray = np.empty(0)
+        self.volume: np.ndarray = np.empty(0)
+        self.turnover: np.ndarray = np.empty(0)
+    #------------------------------------------------------------------------------------------------- 
+    def __len__(self) -> int:
+        """
+        """
+        return len(self.timestamps)
+    #------------------------------------------------------------------------------------------------- 
+    @classmethod
+    def from_kline_data(cls, req: HistoryRequest, gateway_name: str, data: dict) -> "MexcBarFrame":
+        """
+        将K线接口返回的并列数组一次性转换为numpy数组
+        """
+        frame = cls(req, gateway_name)
+        frame.timestamps = np.asarray(data["time"], dtype=np.int64)
+        frame.open_price = np.asarray(data["open"], dtype=np.float64)
+        frame.high_price = np.asarray(data["high"], dtype=np.float64)
+        frame.low_price = np.asarray(data["low"], dtype=np.float64)
+        frame.close_price = np.asarray(data["close"], dtype=np.float64)
+        frame.volume = np.asarray(data["vol"], dtype=np.float64)
+        if "amount" in data:
+            frame.turnover = np.asarray(data["amount"], dtype=np.float64)
+        else:
+            frame.turnover = np.zeros(len(frame.timestamps))
+        return frame
+    #------------------------------------------------------------------------------------------------- 
+    @classmethod
+    def concat(cls, req: HistoryRequest, gateway_name: str, frames: List["MexcBarFrame"]) -> "MexcBarFrame":
+        """
+        合并多段K线，按时间排序去重，同一时间保留靠前frames中的数据
+        """
+        frame = cls(req, gateway_name)
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return frame
+
+        timestamps = np.concatenate([f.timestamps for f in frames])
+        frame.timestamps, index = np.unique(timestamps, return_index=True)
+        for name in ["open_price", "high_price", "low_price", "close_price", "volume", "turnover"]:
+            setattr(frame, name, np.concatenate([getattr(f, name) for f in frames])[index])
+        return frame
+    #------------------------------------------------------------------------------------------------- 
+    def slice(self, start_time: int, end_time: int) -> "MexcBarFrame":
+        """
+        截取[start_time, end_time]时间段(秒)
+        """
+        begin = np.searchsorted(self.timestamps, start_time, side="left")
+        end = np.searchsorted(self.timestamps, end_time, side="right")
+
+        frame = copy(self)
+        for name in ["timestamps", "open_price", "high_price", "low_price", "close_price", "volume", "turnover"]:
+            setattr(frame, name, getattr(self, name)[begin:end])
+        return frame
+    #------------------------------------------------------------------------------------------------- 
+    def to_bars(self) -> List[BarData]:
+        """
+        生成BarData列表
+        """
+        bars: List[BarData] = []
+        columns = zip(
+            self.timestamps.tolist(),
+            self.open_price.tolist(),
+            self.high_price.tolist(),
+            self.low_price.tolist(),
+            self.close_price.tolist(),
+            self.volume.tolist(),
+            self.turnover.tolist()
+        )
+        for timestamp, open_price, high_price, low_price, close_price, volume, turnover in columns:
+            bar = BarData(
+                symbol=self.symbol,
+                exchange=self.exchange,
+                datetime=get_local_datetime(timestamp * 1000),
+                interval=self.interval,
+                volume=volume,
+                turnover=turnover,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                close_price=close_price,
+                gateway_name=self.gateway_name
+            )
+            bars.append(bar)
+        return bars
+#------------------------------------------------------------------------------------------------- 
+class MexcKlineCache:
+    """
+    本地K线缓存
+
+    * 每个合约每个周期保存为一个npz文件，包含K线记录和已覆盖的时间段
+    """
+    def __init__(self, root: Path):
+        """
+        """
+        self.root: Path = root
+        self.locks: Dict[Tuple[str, Interval], Lock] = {}
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def get_lock(self, symbol: str, interval: Interval) -> Lock:
+        """
+        获取单个缓存文件的读写锁
+        """
+        with self.lock:
+            key = (symbol, interval)
+            if key not in self.locks:
+                self.locks[key] = Lock()
+            return self.locks[key]
+    #------------------------------------------------------------------------------------------------- 
+    def get_path(self, symbol: str, interval: Interval) -> Path:
+        """
+        """
+        return self.root.joinpath(f"{symbol}_{interval.value}.npz")
+    #------------------------------------------------------------------------------------------------- 
+    def load(self, req: HistoryRequest, gateway_name: str) -> Tuple["MexcBarFrame", int, int]:
+        """
+        读取缓存，返回(K线，覆盖开始时间，覆盖结束时间)
+        """
+        frame = MexcBarFrame(req, gateway_name)
+
+        path = self.get_path(req.symbol, req.interval)
+        if not path.exists():
+            return frame, 0, 0
+
+        with np.load(path) as data:
+            frame.timestamps = data["timestamps"]
+            frame.open_price = data["open_price"]
+            frame.high_price = data["high_price"]
+            frame.low_price = data["low_price"]
+            frame.close_price = data["close_price"]
+            frame.volume = data["volume"]
+            frame.turnover = data["turnover"]
+            cache_start, cache_end = data["cover"].tolist()
+
+        return frame, cache_start, cache_end
+    #------------------------------------------------------------------------------------------------- 
+    def save(self, frame: "MexcBarFrame", cache_start: int, cache_end: int) -> None:
+        """
+        写入缓存，先写临时文件再替换，避免中断时损坏缓存
+        """
+        path = self.get_path(frame.symbol, frame.interval)
+        temp_path = path.with_suffix(".tmp")
+
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                timestamps=frame.timestamps,
+                open_price=frame.open_price,
+                high_price=frame.high_price,
+                low_price=frame.low_price,
+                close_price=frame.close_price,
+                volume=frame.volume,
+                turnover=frame.turnover,
+                cover=np.array([cache_start, cache_end], dtype=np.int64)
+            )
+        temp_path.replace(path)
+#------------------------------------------------------------------------------------------------- 
+class MexcTokenBucket:
+    """
+    令牌桶限速器
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        rate为每秒补充令牌数，capacity为令牌桶容量
+        """
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self.tokens: float = capacity
+        self.last_time: float = time()
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def refill(self) -> None:
+        """
+        按流逝时间补充令牌
+        """
+        now = time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+    #------------------------------------------------------------------------------------------------- 
+    def acquire(self) -> None:
+        """
+        取得一个令牌，令牌不足时阻塞等待
+        """
+        with self.lock:
+            self.refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait:
+            sleep(wait)
+    #------------------------------------------------------------------------------------------------- 
+    def backoff(self, seconds: float) -> None:
+        """
+        暂停发放令牌seconds秒
+        """
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+#------------------------------------------------------------------------------------------------- 
+class MexcRequestScheduler:
+    """
+    REST请求调度器
+
+    * 每个限速分组一个令牌桶、一个优先级队列和一个发送线程
+    * 取得令牌后再从队列取出请求，撤单和下单总是排在查询之前
+    * 收到限频错误后该分组指数退避，成功回报后恢复
+    """
+    def __init__(self, rest_api: MexcRestApi):
+        """
+        """
+        self.rest_api: MexcRestApi = rest_api
+
+        self.buckets: Dict[str, MexcTokenBucket] = {}
+        self.queues: Dict[str, PriorityQueue] = {}
+        self.failures: Dict[str, int] = {}
+        for group, (rate, capacity) in RATE_LIMIT_MAP.items():
+            self.buckets[group] = MexcTokenBucket(rate, capacity)
+            self.queues[group] = PriorityQueue()
+            self.failures[group] = 0
+
+        self.threads: List[Thread] = []
+        self.active: bool = False
+        self.count: int = 0
+        self.count_lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def start(self) -> None:
+        """
+        """
+        if self.active:
+            return
+        self.active = True
+
+        for group in self.queues:
+            thread = Thread(target=self.run, args=(group,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    #------------------------------------------------------------------------------------------------- 
+    def stop(self) -> None:
+        """
+        """
+        self.active = False
+        for queue in self.queues.values():
+            queue.put((-1, 0, None))
+    #------------------------------------------------------------------------------------------------- 
+    def put(self, path: str, kwargs: dict) -> None:
+        """
+        请求排队，同优先级按先后顺序发送
+        """
+        group, priority = get_request_group(path)
+
+        callback = kwargs["callback"]
+        on_failed = kwargs["on_failed"] or self.rest_api.on_failed
+
+        def on_response(data: Any, request: Request) -> None:
+            if isinstance(data, dict) and data.get("code", None) in RATE_LIMIT_CODES:
+                self.backoff(group)
+            else:
+                self.failures[group] = 0
+            callback(data, request)
+
+        def on_response_failed(status_code: int, request: Request) -> None:
+            if status_code == 429:
+                self.backoff(group)
+            on_failed(status_code, request)
+
+        kwargs["callback"] = on_response
+        kwargs["on_failed"] = on_response_failed
+
+        with self.count_lock:
+            self.count += 1
+            count = self.count
+        self.queues[group].put((priority, count, kwargs))
+    #------------------------------------------------------------------------------------------------- 
+    def backoff(self, group: str) -> None:
+        """
+        分组触发限频后暂停发送
+        """
+        self.failures[group] += 1
+        seconds = min(BACKOFF_SECONDS * 2 ** (self.failures[group] - 1), BACKOFF_MAX_SECONDS)
+        self.buckets[group].backoff(seconds)
+
+        self.rest_api.gateway.write_log(f"交易接口：{self.rest_api.gateway_name}，{group}接口触发限频，暂停{seconds}秒")
+    #------------------------------------------------------------------------------------------------- 
+    def run(self, group: str) -> None:
+        """
+        分组发送线程
+        """
+        bucket = self.buckets[group]
+        queue = self.queues[group]
+
+        while self.active:
+            bucket.acquire()
+            _, _, kwargs = queue.get()
+            if not kwargs:
+                break
+            RestClient.add_request(self.rest_api, **kwargs)
+#------------------------------------------------------------------------------------------------- 
+class MexcWebsocketApiBase(WebsocketClient):
+    """
+    """
+
+    def __init__(self, gateway):
+        """
+        """
+        super(MexcWebsocketApiBase, self).__init__()
+
+        self.gateway: MexcGateway = gateway
+        self.gateway_name: str = gateway.gateway_name
+
+        self.key: str = ""
+        self.secret: str = ""
+        self.passphrase: str = ""
+        self.count = 0
+
+        # 频道回调映射，不在映射中且keep_channel返回False的频道在解包前直接丢弃
+        self.callbacks: Dict[str, Callable[[dict], None]] = {
+            "rs.login": self.on_login_msg,
+            "rs.error": self.on_error_msg,
+        }
+
+    def send_packet(self, packet: dict):
+        """
+        发送数据包字典到服务器。
+
+        如果需要发送非json数据，请重载实现本函数。
+        """
+        if self._ws:
+            if packet in ["pong","ping"]:
+                text = packet
+            else:
+                text: str = json.dumps(packet)
+            self._record_last_sent_text(text)
+
+            coro: coroutine = self._ws.send_str(text)
+            run_coroutine_threadsafe(coro, self._loop)
+    def unpack_data(self, data: str):
+        """
+        对字符串数据进行json格式解包
+
+        如果需要使用json以外的解包格式，请重载实现本函数。
+        """
+        if data in ["pong","ping"]:
+            return None
+
+        # 先读取频道名称，丢弃无需处理的数据包(pong等)，避免完整解析
+        channel = get_packet_channel(data)
+        if channel not in self.callbacks and not self.keep_channel(channel):
+            return None
+        return json_loads(data)
+    #------------------------------------------------------------------------------------------------- 
+    def keep_channel(self, channel: str) -> bool:
+        """
+        没有回调的频道是否仍需解包，默认保留订阅回执(rs.sub.*)
+        """
+        return channel.startswith("rs.sub")
+    #------------------------------------------------------------------------------------------------- 
+    def connect(
+        self,
+        key: str,
+        secret: str,
+        url: str,
+        proxy_host: str,
+        proxy_port: int
+    ) -> None:
+        """
+        """
+        self.key = key
+        self.secret = secret
+
+        self.init(url, proxy_host, proxy_port)
+        self.start()
+        self.gateway.event_engine.register(EVENT_TIMER,self.send_ping)
+    #------------------------------------------------------------------------------------------------- 
+    def send_ping(self,event):
+        self.count +=1
+        if self.count < 15:
+            return
+        self.count = 0
+        message={
+            "method": "ping"
+        }
+        self.send_packet(message)
+    #------------------------------------------------------------------------------------------------- 
+    def login(self) -> int:
+        """
+        """
+        timestamp = str(int(time()))
+
+        #message = self.key+ 'GET' + timestamp
+        message = self.key + timestamp
+        signature = create_signature(self.secret,message)
+        params = {
+            "method":"login",
+            "param":{
+                "apiKey":self.key,
+                "reqTime":timestamp,
+                "signature":signature
+            }
+        }
+        return self.send_packet(params)
+    #------------------------------------------------------------------------------------------------- 
+    def on_login(self) -> None:
+        """
+        """
+        pass
+    #------------------------------------------------------------------------------------------------- 
+    def on_login_msg(self, packet: dict) -> None:
+        """
+        """
+        if packet["data"] == "success":
+            self.on_login()
+    #------------------------------------------------------------------------------------------------- 
+    def on_packet(self, packet: Union[dict, None]) -> None:
+        """
+        """
+        if not packet:
+            return
+        callback = self.callbacks.get(packet["channel"], None)
+        if callback:
+            callback(packet)
+        else:
+            self.on_other_packet(packet)
+    #------------------------------------------------------------------------------------------------- 
+    def on_other_packet(self, packet: dict) -> None:
+        """
+        没有回调的频道，订阅失败时输出日志
+        """
+        if packet["channel"].startswith("rs.sub") and packet.get("data", None) != "success":
+            self.gateway.write_log(f"交易接口：{self.gateway_name} WebSocket API订阅失败，回报信息：{packet}")
+    #------------------------------------------------------------------------------------------------- 
+    def on_error_msg(self, packet) -> None:
+        """
+        """
+        msg = packet["data"]
+        self.gateway.write_log(f"交易接口：{self.gateway_name} WebSocket API收到错误回报，回报信息：{msg}")
+#------------------------------------------------------------------------------------------------- 
+class MexcDataWebsocketApi(MexcWebsocketApiBase):
+    """
+    """
+
+    def __init__(self, gateway: MexcGateway, index: int = 0):
+        """
+        """
+        super().__init__(gateway)
+
+        self.index: int = index
+        self.recorder: MexcTickRecorder = None
+        self.bar_builder: MexcBarBuilder = None
+        self.ticks:Dict[str,TickData] = {}
+        self.books: Dict[str, MexcOrderBook] = {}
+        self.depth_mode: str = DEPTH_MODE_FULL
+
+        # 订阅登记表，断线重连后全部重新订阅
+        self.subscribed: Dict[str, SubscribeRequest] = {}
+        self.pending_symbols: List[str] = []
+        self.subscribe_lock: Lock = Lock()
+        self.connected: bool = False
+
+        self.callbacks.update({
+            "push.ticker": self.on_tick,
+            "push.depth.full": self.on_depth,
+            "push.depth": self.on_depth_update,
+            "push.deal": self.on_deal,
+        })
+
+        # tick合并推送，窗口内只推送每个合约最新的合并行情
+        self.conflate_interval: float = 0
+        self.dirty_symbols: set = set()
+    #------------------------------------------------------------------------------------------------- 
+    def connect(
+        self,
+        key: str,
+        secret: str,
+        proxy_host: str,
+        proxy_port: int,
+        depth_mode: str = DEPTH_MODE_FULL,
+        conflate_window: int = 0
+    ) -> None:
+        """
+        """
+        self.depth_mode = depth_mode
+        self.conflate_interval = conflate_window / 1000
+        super().connect(
+            key,
+            secret,
+            WEBSOCKET_DATA_HOST,
+            proxy_host,
+            proxy_port
+        )
+        self.gateway.event_engine.register(EVENT_TIMER, self.process_timer_event)
+    #------------------------------------------------------------------------------------------------- 
+    def on_connected(self) -> None:
+        """
+        """
+        self.gateway.write_log(f"行情接口：{self.gateway_name}，行情Websocket API[{self.index}]连接成功")
+
+        # 重连后重新发送全部订阅
+        with self.subscribe_lock:
+            self.connected = True
+            self.pending_symbols = list(self.subscribed)
+        self.send_pending()
+    #-------------------------------------------------------------------------------------------------
+    def on_disconnected(self):
+        """
+        ws行情断开回调
+        """
+        self.connected = False
+        self.gateway.write_log(f"行情接口：{self.gateway_name}，行情Websocket API[{self.index}]连接断开")
+    #------------------------------------------------------------------------------------------------- 
+    def process_timer_event(self, event: Event) -> None:
+        """
+        定时发送排队中的订阅
+        """
+        if self.pending_symbols:
+            self.send_pending()
+    #------------------------------------------------------------------------------------------------- 
+    def subscribe(self, req: SubscribeRequest) -> None:
+        """
+        订阅合约，立即返回，合约信息就绪且连接可用后分批发送
+        """
+        with self.subscribe_lock:
+            if req.symbol in self.subscribed:
+                return
+            self.subscribed[req.symbol] = req
+            self.pending_symbols.append(req.symbol)
+
+        self.send_pending()
+    #------------------------------------------------------------------------------------------------- 
+    def send_pending(self) -> None:
+        """
+        发送一批排队中的订阅
+        """
+        if not self.connected or not self.gateway.rest_api.contract_inited:
+            return
+
+        with self.subscribe_lock:
+            symbols = self.pending_symbols[:SUBSCRIBE_BATCH_SIZE]
+            self.pending_symbols = self.pending_symbols[SUBSCRIBE_BATCH_SIZE:]
+
+        for symbol in symbols:
+            if symbol not in symbol_contract_map:
+                self.gateway.write_log(f"找不到该合约代码{symbol}")
+                with self.subscribe_lock:
+                    self.subscribed.pop(symbol, None)
+                self.gateway.market_ws_api.release_symbol(symbol)
+                continue
+
+            self.subscribe_symbol(symbol)
+    #------------------------------------------------------------------------------------------------- 
+    def subscribe_symbol(self, symbol: str) -> None:
+        """
+        发送单个合约的行情订阅
+        """
+        if symbol not in self.ticks:
+            tick = TickData(
+                symbol=symbol,
+                name=symbol_contract_map[symbol].name,
+                exchange=Exchange.MEXC,
+                datetime=datetime.now(CHINA_TZ),
+                gateway_name=self.gateway_name,
+            )
+            self.ticks[symbol] = tick
+
+        msg: dict = {
+            "method":"sub.ticker",
+            "param":{
+                "symbol":symbol
+            }
+        }
+        self.send_packet(msg)
+
+        if self.depth_mode == DEPTH_MODE_INCREMENTAL:
+            # 重新订阅时丢弃旧订单簿，收到推送后重新同步快照
+            self.books[symbol] = MexcOrderBook(symbol)
+            msg: dict = {
+                "method":"sub.depth",
+                "param":{
+                    "symbol":symbol
+                }
+            }
+        else:
+            msg: dict = {
+                "method":"sub.depth.full",
+                "param":{
+                    "symbol":symbol,
+                    "limit":5
+                }
+            }
+        self.send_packet(msg)
+
+        if self.bar_builder:
+            msg: dict = {
+                "method":"sub.deal",
+                "param":{
+                    "symbol":symbol
+                }
+            }
+            self.send_packet(msg)
+    #------------------------------------------------------------------------------------------------- 
+    def on_tick(self, packet: dict) -> None:
+        """
+        收到tick数据推送
+        """
+        data = packet["data"]
+        tick: TickData = self.ticks[data["symbol"]]
+
+        tick.volume = float(data['volume24'])
+        tick.high_price = float(data["high24Price"])
+        tick.low_price = float(data["lower24Price"])
+        tick.last_price = float(data["lastPrice"])
+        tick.datetime = get_local_datetime(data["timestamp"])
+        tick.bid_price_1 = float(data["bid1"])
+        tick.ask_price_1 = float(data["ask1"])
+        tick.open_interest = float(data["holdVol"])
+
+        if self.recorder:
+            self.recorder.record_ticker(data)
+
+        if tick.last_price:
+            tick.localtime = datetime.now()
+            self.publish_tick(tick)
+    #------------------------------------------------------------------------------------------------- 
+    def on_depth(self, data: dict) -> None:
+        """
+        行情深度推送
+        """
+        tick: TickData = self.ticks[data["symbol"]]
+
+        tick.datetime = get_local_datetime(int(data["ts"]))
+        data_=data["data"]
+
+        bids = data_["bids"]
+        asks = data_["asks"]
+        for index in range(len(bids)):
+            price, volume , ordercount = bids[index]
+            tick.__setattr__("bid_price_" + str(index + 1), float(price))
+            tick.__setattr__("bid_volume_" + str(index + 1), float(volume))
+
+        for index in range(len(asks)):
+            price, volume , ordercount = asks[index]
+            tick.__setattr__("ask_price_" + str(index + 1), float(price))
+            tick.__setattr__("ask_volume_" + str(index + 1), float(volume))
+
+        if self.recorder:
+            self.recorder.record_depth(data["symbol"], int(data["ts"]), int(data_.get("version", 0)), bids, asks)
+
+        if tick.last_price:
+            self.publish_tick(tick)
+    #------------------------------------------------------------------------------------------------- 
+    def on_deal(self, packet: dict) -> None:
+        """
+        逐笔成交推送，合成K线
+        """
+        symbol = packet["symbol"]
+        data = packet["data"]
+        deals = data if isinstance(data, list) else [data]
+
+        for deal in deals:
+            self.bar_builder.update_deal(symbol, float(deal["p"]), float(deal["v"]), int(deal["t"]))
+    #------------------------------------------------------------------------------------------------- 
+    def publish_tick(self, tick: TickData) -> None:
+        """
+        推送tick，开启合并窗口时每个合约每个窗口只推送一次
+
+        只在websocket事件循环线程中调用(深度快照也先转到该线程处理)，tick和dirty_symbols无需加锁
+        """
+        if not self.conflate_interval:
+            self.gateway.on_tick(copy(tick))
+            return
+
+        if tick.symbol in self.dirty_symbols:
+            return
+        self.dirty_symbols.add(tick.symbol)
+
+        self._loop.call_later(self.conflate_interval, self.flush_tick, tick.symbol)
+    #------------------------------------------------------------------------------------------------- 
+    def flush_tick(self, symbol: str) -> None:
+        """
+        推送合并窗口内最新的tick
+        """
+        self.dirty_symbols.discard(symbol)
+        self.gateway.on_tick(copy(self.ticks[symbol]))
+    #------------------------------------------------------------------------------------------------- 
+    def on_depth_update(self, packet: dict) -> None:
+        """
+        增量深度推送，按版本号合并到本地订单簿
+        """
+        symbol = packet["symbol"]
+        book: MexcOrderBook = self.books.get(symbol, None)
+        if not book:
+            return
+
+        data = packet["data"]
+        resync = False
+        with book.lock:
+            if not book.inited:
+                book.buffer_update(data)
+                resync = not book.syncing
+            elif not book.update(data):
+                # 版本号不连续，丢弃本地订单簿并重新获取快照
+                self.gateway.write_log(f"行情接口：{self.gateway_name}，{symbol}深度版本不连续，本地：{book.version}，推送：{data['version']}，重新同步")
+                book.clear()
+                book.buffer_update(data)
+                resync = True
+
+            if resync:
+                book.syncing = True
+            elif book.inited:
+                self.update_tick_depth(symbol, int(packet["ts"]))
+
+        if resync:
+            self.query_depth_snapshot(symbol)
+    #------------------------------------------------------------------------------------------------- 
+    def query_depth_snapshot(self, symbol: str) -> None:
+        """
+        查询REST深度快照
+        """
+        self.gateway.rest_api.add_request(
+            method="GET",
+            path=f"/api/v1/contract/depth/{symbol}",
+            callback=self.on_depth_snapshot,
+            on_failed=self.on_depth_snapshot_failed,
+            on_error=self.on_depth_snapshot_error,
+            extra=symbol
+        )
+    #------------------------------------------------------------------------------------------------- 
+    def on_depth_snapshot(self, data: dict, request: Request) -> None:
+        """
+        收到深度快照(REST线程)，转到websocket事件循环中处理，与增量推送同线程修改订单簿和tick
+        """
+        self._loop.call_soon_threadsafe(self.apply_depth_snapshot, data, request)
+    #------------------------------------------------------------------------------------------------- 
+    def apply_depth_snapshot(self, data: dict, request: Request) -> None:
+        """
+        应用深度快照，回放缓存的增量推送
+        """
+        symbol = request.extra
+        book: MexcOrderBook = self.books[symbol]
+
+        if self.gateway.rest_api.check_error(data, "查询深度快照"):
+            with book.lock:
+                book.syncing = False
+            return
+
+        resync = False
+        with book.lock:
+            book.apply_snapshot(data["data"])
+            buffer = book.buffer
+            book.buffer = []
+
+            for update in buffer:
+                if update["version"] <= book.version:
+                    continue
+                if not book.update(update):
+                    book.clear()
+                    book.buffer_update(update)
+                    resync = True
+                    break
+
+            if not resync:
+                book.syncing = False
+                self.update_tick_depth(symbol, int(data["data"].get("timestamp", time() * 1000)))
+
+        if resync:
+            self.query_depth_snapshot(symbol)
+    #------------------------------------------------------------------------------------------------- 
+    def on_depth_snapshot_failed(self, status_code: int, request: Request) -> None:
+        """
+        深度快照查询失败(REST线程)，转到websocket事件循环中处理
+        """
+        self._loop.call_soon_threadsafe(self.apply_depth_snapshot_failed, f"状态码：{status_code}", request)
+    #------------------------------------------------------------------------------------------------- 
+    def on_depth_snapshot_error(
+        self,
+        exception_type: type,
+        exception_value: Exception,
+        tb,
+        request: Request
+    ) -> None:
+        """
+        深度快照查询异常(REST线程)，转到websocket事件循环中处理
+        """
+        self._loop.call_soon_threadsafe(self.apply_depth_snapshot_failed, f"异常：{repr(exception_value)}", request)
+    #------------------------------------------------------------------------------------------------- 
+    def apply_depth_snapshot_failed(self, reason: str, request: Request) -> None:
+        """
+        深度快照查询失败，等待下一次增量推送时重试
+        """
+        symbol = request.extra
+        book: MexcOrderBook = self.books[symbol]
+        with book.lock:
+            book.syncing = False
+
+        self.gateway.write_log(f"行情接口：{self.gateway_name}，{symbol}深度快照查询失败，{reason}")
+    #------------------------------------------------------------------------------------------------- 
+    def update_tick_depth(self, symbol: str, timestamp: int) -> None:
+        """
+        用本地订单簿前5档更新tick
+        """
+        tick: TickData = self.ticks[symbol]
+        book: MexcOrderBook = self.books[symbol]
+
+        tick.datetime = get_local_datetime(timestamp)
+
+        if self.recorder:
+            self.recorder.record_depth(
+                symbol,
+                timestamp,
+                book.version,
+                book.get_bids(RECORD_DEPTH_LEVELS),
+                book.get_asks(RECORD_DEPTH_LEVELS)
+            )
+
+        bids = book.get_bids(5)
+        asks = book.get_asks(5)
+        for index in range(5):
+            if index < len(bids):
+                price, volume = bids[index]
+            else:
+                price, volume = 0, 0
+            tick.__setattr__("bid_price_" + str(index + 1), price)
+            tick.__setattr__("bid_volume_" + str(index + 1), volume)
+
+            if index < len(asks):
+                price, volume = asks[index]
+            else:
+                price, volume = 0, 0
+            tick.__setattr__("ask_price_" + str(index + 1), price)
+            tick.__setattr__("ask_volume_" + str(index + 1), volume)
+
+        if tick.last_price:
+            self.publish_tick(tick)
+#------------------------------------------------------------------------------------------------- 
+class MexcDataWebsocketPool:
+    """
+    行情Websocket连接池
 
-        self.ticks:Dict[str,TickData] = {}
+    * 按固定连接数或单连接最大合约数将合约分散到多个连接
+    * 每个连接独立断线重连，tick统一通过gateway.on_tick推送
+    """
+    def __init__(self, gateway: MexcGateway):
+        """
+        """
+        self.gateway: MexcGateway = gateway
+        self.gateway_name: str = gateway.gateway_name
+
+        self.apis: List[MexcDataWebsocketApi] = []
+        self.symbol_api_map: Dict[str, MexcDataWebsocketApi] = {}
+        self.api_symbol_count: Dict[int, int] = {}
+
+        self.max_symbols: int = 0
+        self.connect_args: tuple = ()
+        self.recorder: MexcTickRecorder = None
+        self.bar_builder: MexcBarBuilder = None
+        self.lock: Lock = Lock()
     #------------------------------------------------------------------------------------------------- 
     def connect(
         self,
         key: str,
         secret: str,
         proxy_host: str,
-        proxy_port: int
+        proxy_port: int,
+        depth_mode: str = DEPTH_MODE_FULL,
+        conflate_window: int = 0,
+        session_count: int = 1,
+        max_symbols: int = 0,
+        record_enabled: bool = False,
+        bar_windows: List[int] = None
     ) -> None:
         """
+        max_symbols大于0时按需新建连接，否则固定使用session_count个连接
         """
-        super().connect(
-            key,
-            secret,
-            WEBSOCKET_DATA_HOST,
-            proxy_host,
-            proxy_port
-        )
+        self.connect_args = (key, secret, proxy_host, proxy_port, depth_mode, conflate_window)
+        self.max_symbols = max_symbols
+
+        if record_enabled:
+            self.recorder = MexcTickRecorder(get_folder_path("mexc_tick_record"))
+
+        if bar_windows:
+            self.bar_builder = MexcBarBuilder(self.gateway, bar_windows)
+
+        if max_symbols:
+            session_count = 1
+
+        with self.lock:
+            for _ in range(max(session_count, 1)):
+                self.add_api()
     #------------------------------------------------------------------------------------------------- 
-    def on_connected(self) -> None:
+    def add_api(self) -> MexcDataWebsocketApi:
         """
+        新建并连接一个行情Websocket
         """
-        self.gateway.write_log(f"行情接口：{self.gateway_name}，行情Websocket API连接成功")
+        api = MexcDataWebsocketApi(self.gateway, len(self.apis))
+        api.recorder = self.recorder
+        api.bar_builder = self.bar_builder
+        api.connect(*self.connect_args)
 
-    #-------------------------------------------------------------------------------------------------
-    def on_disconnected(self):
+        self.apis.append(api)
+        self.api_symbol_count[api.index] = 0
+        return api
+    #------------------------------------------------------------------------------------------------- 
+    def get_api(self) -> MexcDataWebsocketApi:
         """
-        ws行情断开回调
+        为新合约选择行情连接
         """
-        self.gateway.write_log(f"行情接口：{self.gateway_name}，行情Websocket API连接断开")
+        if self.max_symbols:
+            for api in self.apis:
+                if self.api_symbol_count[api.index] < self.max_symbols:
+                    return api
+            return self.add_api()
+
+        return min(self.apis, key=lambda api: self.api_symbol_count[api.index])
     #------------------------------------------------------------------------------------------------- 
     def subscribe(self, req: SubscribeRequest) -> None:
         """
         订阅合约
         """
-        # 等待rest合约数据推送完成再订阅
-        while not self.gateway.rest_api.contract_inited:
-            sleep(1)
-
-        if req.symbol in self.ticks:
-            return
-        
-        if req.symbol not in symbol_contract_map:
+        # 合约信息已就绪时，未知合约不占用连接名额
+        if self.gateway.rest_api.contract_inited and req.symbol not in symbol_contract_map:
             self.gateway.write_log(f"找不到该合约代码{req.symbol}")
             return
-        
-        tick = TickData(
-            symbol=req.symbol,
-            name=symbol_contract_map[req.symbol].name,
-            exchange=Exchange.MEXC,
-            datetime=datetime.now(CHINA_TZ),
-            gateway_name=self.gateway_name,
-        )
 
-        self.ticks[req.symbol] = tick
+        with self.lock:
+            api = self.symbol_api_map.get(req.symbol, None)
+            if not api:
+                api = self.get_api()
+                self.symbol_api_map[req.symbol] = api
+                self.api_symbol_count[api.index] += 1
 
-        msg: dict = {
-            "method":"sub.ticker",
-            "param":{
-                "symbol":req.symbol
-            }
-        }
-        self.send_packet(msg)
+        api.subscribe(req)
+    #------------------------------------------------------------------------------------------------- 
+    def release_symbol(self, symbol: str) -> None:
+        """
+        释放合约占用的连接名额(合约信息就绪前订阅、之后发现合约不存在时调用)
+        """
+        with self.lock:
+            api = self.symbol_api_map.pop(symbol, None)
+            if api:
+                self.api_symbol_count[api.index] -= 1
+    #------------------------------------------------------------------------------------------------- 
+    def get_order_book(self, symbol: str) -> "MexcOrderBook":
+        """
+        获取增量深度模式下的本地订单簿
+        """
+        api = self.symbol_api_map.get(symbol, None)
+        if not api:
+            return None
+        return api.books.get(symbol, None)
+    #------------------------------------------------------------------------------------------------- 
+    def stop(self) -> None:
+        """
+        关闭全部行情连接
+        """
+        for api in self.apis:
+            api.stop()
 
-        msg: dict = {
-            "method":"sub.depth.full",
-            "param":{
-                "symbol":req.symbol,
-                "limit":5
-            }
+        if self.recorder:
+            self.recorder.close()
+#------------------------------------------------------------------------------------------------- 
+class MexcBarBuilder:
+    """
+    逐笔成交K线合成器
+
+    * 按成交时间戳将成交归入各周期的K线，收到下一周期成交时推送上一根K线
+    * 没有新成交时由定时器在周期结束BAR_CLOSE_DELAY毫秒后推送
+    """
+    def __init__(self, gateway: MexcGateway, windows: List[int]):
+        """
+        windows为K线周期秒数列表，超过1天的周期必须是整天数
+
+        只有60、3600、86400秒的K线带有对应的Interval，其他周期interval为None，
+        需要通过bar.extra["window"]区分
+        """
+        self.gateway: MexcGateway = gateway
+        self.gateway_name: str = gateway.gateway_name
+        self.windows: List[int] = []
+
+        for window in windows:
+            if window <= 0 or (window > 86400 and window % 86400):
+                self.gateway.write_log(f"不支持的成交K线周期：{window}秒")
+            else:
+                self.windows.append(window)
+
+        self.bars: Dict[Tuple[str, int], BarData] = {}
+        self.bar_starts: Dict[Tuple[str, int], int] = {}
+        self.bar_counts: Dict[Tuple[str, int], int] = {}
+        self.lock: Lock = Lock()
+
+        self.gateway.event_engine.register(EVENT_TIMER, self.process_timer_event)
+    #------------------------------------------------------------------------------------------------- 
+    def update_deal(self, symbol: str, price: float, volume: float, timestamp: int) -> None:
+        """
+        更新一笔成交
+        """
+        with self.lock:
+            for window in self.windows:
+                key = (symbol, window)
+                start = timestamp - (timestamp + CHINA_OFFSET_MS) % (window * 1000)
+
+                bar = self.bars.get(key, None)
+                if bar:
+                    bar_start = self.bar_starts[key]
+                    # 迟到的上一周期成交直接丢弃
+                    if start < bar_start:
+                        continue
+                    elif start > bar_start:
+                        self.close_bar(key)
+                        bar = None
+
+                if not bar:
+                    bar = BarData(
+                        symbol=symbol,
+                        exchange=Exchange.MEXC,
+                        datetime=get_local_datetime(start),
+                        interval=get_window_interval(window),
+                        open_price=price,
+                        high_price=price,
+                        low_price=price,
+                        close_price=price,
+                        gateway_name=self.gateway_name
+                    )
+                    self.bars[key] = bar
+                    self.bar_starts[key] = start
+                    self.bar_counts[key] = 0
+                else:
+                    bar.high_price = max(bar.high_price, price)
+                    bar.low_price = min(bar.low_price, price)
+                    bar.close_price = price
+
+                bar.volume += volume
+                bar.turnover += price * volume
+                self.bar_counts[key] += 1
+    #------------------------------------------------------------------------------------------------- 
+    def close_bar(self, key: Tuple[str, int]) -> None:
+        """
+        推送已完成的K线，extra中记录周期秒数和成交笔数
+        """
+        bar = self.bars.pop(key)
+        self.bar_starts.pop(key)
+        bar.extra = {
+            "window": key[1],
+            "count": self.bar_counts.pop(key)
         }
-        self.send_packet(msg)
+        self.gateway.on_bar(bar)
     #------------------------------------------------------------------------------------------------- 
-    def on_data(self, packet) -> None:
+    def process_timer_event(self, event: Event) -> None:
+        """
+        推送已超过结束时间的K线
+        """
+        now = int(time() * 1000)
+        with self.lock:
+            for key, start in list(self.bar_starts.items()):
+                if now >= start + key[1] * 1000 + BAR_CLOSE_DELAY:
+                    self.close_bar(key)
+#------------------------------------------------------------------------------------------------- 
+class MexcTickRecorder:
+    """
+    行情记录器
+
+    * 每个合约每天的ticker和深度推送分别追加到一个内存映射文件
+    * 文件内容为定长numpy结构化记录，可用load_record_file零拷贝读取
+    """
+    def __init__(self, root: Path):
         """
         """
-        channel = packet["channel"]
-        if channel == "push.ticker":
-            self.on_tick(packet["data"])
-        elif channel == "push.depth.full":
-            self.on_depth(packet)
+        self.root: Path = root
+        self.files: Dict[Tuple[str, str], MexcRecordFile] = {}
+        self.lock: Lock = Lock()
     #------------------------------------------------------------------------------------------------- 
-    def on_tick(self, data: dict) -> None:
+    def get_file(self, symbol: str, kind: str, timestamp: int) -> "MexcRecordFile":
         """
-        收到tick数据推送
+        获取当天的记录文件，跨日时关闭旧文件
         """
-        
-        tick: TickData = self.ticks[data["symbol"]]
+        day = (timestamp + CHINA_OFFSET_MS) // 86400000        # 按北京时间切分交易日
+        key = (symbol, kind)
 
-        tick.volume = float(data['volume24'])
-        tick.high_price = float(data["high24Price"])
-        tick.low_price = float(data["lower24Price"])
-        tick.last_price = float(data["lastPrice"])
-        tick.datetime = get_local_datetime(data["timestamp"])
-        tick.bid_price_1 = float(data["bid1"])
-        tick.ask_price_1 = float(data["ask1"])
-        tick.open_interest = float(data["holdVol"])
+        record_file = self.files.get(key, None)
+        if record_file and record_file.day == day:
+            return record_file
 
-        if tick.last_price:
-            tick.localtime = datetime.now()
-            self.gateway.on_tick(copy(tick))
+        if record_file:
+            record_file.close()
+
+        date = datetime.fromtimestamp(timestamp / 1000, CHINA_TZ).strftime("%Y%m%d")
+        folder = self.root.joinpath(symbol)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        record_file = MexcRecordFile(folder.joinpath(f"{date}_{kind}.dat"), RECORD_DTYPE_MAP[kind], day)
+        self.files[key] = record_file
+        return record_file
     #------------------------------------------------------------------------------------------------- 
-    def on_depth(self, data: dict) -> None:
+    def record_ticker(self, data: dict) -> None:
+        """
+        记录ticker推送
+        """
+        timestamp = int(data["timestamp"])
+        values = (
+            timestamp,
+            int(time() * 1000),
+            float(data["lastPrice"]),
+            float(data["bid1"]),
+            float(data["ask1"]),
+            float(data["volume24"]),
+            float(data["high24Price"]),
+            float(data["lower24Price"]),
+            float(data["holdVol"]),
+        )
+        with self.lock:
+            self.get_file(data["symbol"], "ticker", timestamp).append(values)
+    #------------------------------------------------------------------------------------------------- 
+    def record_depth(self, symbol: str, timestamp: int, version: int, bids: list, asks: list) -> None:
+        """
+        记录深度，bids/asks为[(价格，数量，...)]，不足RECORD_DEPTH_LEVELS档补0
+        """
+        bids = bids[:RECORD_DEPTH_LEVELS]
+        asks = asks[:RECORD_DEPTH_LEVELS]
+        bid_padding = [0.0] * (RECORD_DEPTH_LEVELS - len(bids))
+        ask_padding = [0.0] * (RECORD_DEPTH_LEVELS - len(asks))
+
+        values = (
+            timestamp,
+            int(time() * 1000),
+            version,
+            [float(level[0]) for level in bids] + bid_padding,
+            [float(level[1]) for level in bids] + bid_padding,
+            [float(level[0]) for level in asks] + ask_padding,
+            [float(level[1]) for level in asks] + ask_padding,
+        )
+        with self.lock:
+            self.get_file(symbol, "depth", timestamp).append(values)
+    #------------------------------------------------------------------------------------------------- 
+    def close(self) -> None:
         """
-        行情深度推送
+        关闭全部记录文件
         """
-        tick: TickData = self.ticks[data["symbol"]]
+        with self.lock:
+            for record_file in self.files.values():
+                record_file.close()
+            self.files.clear()
+#------------------------------------------------------------------------------------------------- 
+class MexcRecordFile:
+    """
+    按块扩容的内存映射记录文件
+    """
+    def __init__(self, path: Path, dtype: np.dtype, day: int):
+        """
+        """
+        self.path: Path = path
+        self.dtype: np.dtype = dtype
+        self.day: int = day
 
-        tick.datetime = get_local_datetime(int(data["ts"]))
-        data_=data["data"]
+        if not path.exists():
+            with open(path, "wb") as f:
+                f.truncate(RECORD_HEADER_SIZE + RECORD_CHUNK_SIZE * dtype.itemsize)
 
-        bids = data_["bids"]
-        asks = data_["asks"]
-        for index in range(len(bids)):
-            price, volume , ordercount = bids[index]
-            tick.__setattr__("bid_price_" + str(index + 1), float(price))
-            tick.__setattr__("bid_volume_" + str(index + 1), float(volume))
+        self.file = open(path, "r+b")
+        self.mmap: mmap.mmap = None
+        self.header: np.ndarray = None
+        self.records: np.ndarray = None
+        self.capacity: int = 0
+        self.map_file()
 
-        for index in range(len(asks)):
-            price, volume , ordercount = asks[index]
-            tick.__setattr__("ask_price_" + str(index + 1), float(price))
-            tick.__setattr__("ask_volume_" + str(index + 1), float(volume))
+        self.header[1] = dtype.itemsize
+        self.count: int = int(self.header[0])
+    #------------------------------------------------------------------------------------------------- 
+    def map_file(self) -> None:
+        """
+        按当前文件大小映射整个文件，文件头和记录区都是映射上的数组视图
+        """
+        size = self.path.stat().st_size
+        self.mmap = mmap.mmap(self.file.fileno(), size)
 
-        if tick.last_price:
-            self.gateway.on_tick(copy(tick))
-    
+        self.header = np.frombuffer(self.mmap, dtype=np.int64, count=2)
+        self.capacity = (size - RECORD_HEADER_SIZE) // self.dtype.itemsize
+        self.records = np.frombuffer(
+            self.mmap,
+            dtype=self.dtype,
+            count=self.capacity,
+            offset=RECORD_HEADER_SIZE
+        )
+    #------------------------------------------------------------------------------------------------- 
+    def append(self, values: tuple) -> None:
+        """
+        追加一条记录，空间不足时扩容一个块
+        """
+        if self.count >= self.capacity:
+            # Windows下文件仍被映射时无法改变大小，先关闭全部映射
+            self.unmap_file()
+            self.file.truncate(RECORD_HEADER_SIZE + (self.capacity + RECORD_CHUNK_SIZE) * self.dtype.itemsize)
+            self.map_file()
+
+        self.records[self.count] = values
+        self.count += 1
+        self.header[0] = self.count
+    #------------------------------------------------------------------------------------------------- 
+    def unmap_file(self) -> None:
+        """
+        写回并关闭文件映射，关闭前先释放引用映射的数组视图
+        """
+        if self.mmap is None:
+            return
+
+        self.mmap.flush()
+        self.header = None
+        self.records = None
+        self.mmap.close()
+        self.mmap = None
+    #------------------------------------------------------------------------------------------------- 
+    def close(self) -> None:
+        """
+        """
+        self.unmap_file()
+        self.file.close()
+#------------------------------------------------------------------------------------------------- 
+class MexcOrderBook:
+    """
+    增量深度本地订单簿
+
+    * 买卖盘分别用有序的价格数组和数量数组保存，二分查找定位价位
+    * 买盘价格取负数保存，使两侧数组都按从优到劣升序排列
+    """
+    def __init__(self, symbol: str):
+        """
+        """
+        self.symbol: str = symbol
+
+        self.bid_keys: List[float] = []
+        self.bid_volumes: List[float] = []
+        self.ask_keys: List[float] = []
+        self.ask_volumes: List[float] = []
+
+        self.version: int = 0
+        self.inited: bool = False
+        self.syncing: bool = False
+        self.buffer: List[dict] = []
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def buffer_update(self, data: dict) -> None:
+        """
+        缓存等待快照期间的增量推送，最多保留DEPTH_BUFFER_SIZE条
+        """
+        self.buffer.append(data)
+        if len(self.buffer) > DEPTH_BUFFER_SIZE:
+            del self.buffer[0]
+    #------------------------------------------------------------------------------------------------- 
+    def clear(self) -> None:
+        """
+        清空订单簿，等待重新同步
+        """
+        self.bid_keys.clear()
+        self.bid_volumes.clear()
+        self.ask_keys.clear()
+        self.ask_volumes.clear()
+        self.version = 0
+        self.inited = False
+    #------------------------------------------------------------------------------------------------- 
+    def apply_snapshot(self, data: dict) -> None:
+        """
+        用REST深度快照重建订单簿
+        """
+        self.clear()
+
+        for price, volume, *_ in data["bids"]:
+            self.update_level(self.bid_keys, self.bid_volumes, -float(price), float(volume))
+        for price, volume, *_ in data["asks"]:
+            self.update_level(self.ask_keys, self.ask_volumes, float(price), float(volume))
+
+        self.version = int(data["version"])
+        self.inited = True
+    #------------------------------------------------------------------------------------------------- 
+    def update(self, data: dict) -> bool:
+        """
+        合并增量推送，版本号不连续时返回False
+        """
+        version = int(data["version"])
+        if version <= self.version:
+            return True
+        if version != self.version + 1:
+            return False
+
+        for price, volume, *_ in data.get("bids", []):
+            self.update_level(self.bid_keys, self.bid_volumes, -float(price), float(volume))
+        for price, volume, *_ in data.get("asks", []):
+            self.update_level(self.ask_keys, self.ask_volumes, float(price), float(volume))
+
+        self.version = version
+        return True
+    #------------------------------------------------------------------------------------------------- 
+    def update_level(self, keys: List[float], volumes: List[float], key: float, volume: float) -> None:
+        """
+        更新单个价位，数量为0时删除该价位
+        """
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            if volume:
+                volumes[index] = volume
+            else:
+                del keys[index]
+                del volumes[index]
+        elif volume:
+            keys.insert(index, key)
+            volumes.insert(index, volume)
+    #------------------------------------------------------------------------------------------------- 
+    def get_bids(self, depth: int = 0) -> List[Tuple[float, float]]:
+        """
+        获取买盘[(价格，数量)]，depth为0时返回全部价位
+        """
+        depth = depth or len(self.bid_keys)
+        return [(-key, volume) for key, volume in zip(self.bid_keys[:depth], self.bid_volumes[:depth])]
+    #------------------------------------------------------------------------------------------------- 
+    def get_asks(self, depth: int = 0) -> List[Tuple[float, float]]:
+        """
+        获取卖盘[(价格，数量)]，depth为0时返回全部价位
+        """
+        depth = depth or len(self.ask_keys)
+        return list(zip(self.ask_keys[:depth], self.ask_volumes[:depth]))
+#------------------------------------------------------------------------------------------------- 
+class MexcFillTracker:
+    """
+    委托成交跟踪
+
+    * 按交易所委托号记录已推送的累计成交量和成交均价
+    * 收到新的累计成交后计算增量成交量及其成交价格，重复或过期推送返回None
+    """
+    def __init__(self, size: int = ORDER_ARCHIVE_SIZE):
+        """
+        """
+        self.size: int = size
+        self.fills: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self.lock: Lock = Lock()
+    #------------------------------------------------------------------------------------------------- 
+    def update(
+        self,
+        sys_orderid: str,
+        traded: float,
+        avg_price: float,
+        min_volume: float = 0
+    ) -> Union[Tuple[float, float], None]:
+        """
+        更新累计成交，返回(增量成交量，增量成交价格)
+
+        增量成交量按min_volume取整后为0时不记录本次累计成交，留待后续推送合并计算
+        """
+        with self.lock:
+            last_traded, last_price = self.fills.get(sys_orderid, (0, 0))
+            if traded <= last_traded:
+                return None
+
+            volume = traded - last_traded
+            price = (traded * avg_price - last_traded * last_price) / volume
+            if min_volume:
+                volume = round_to(volume, min_volume)
+            if not volume:
+                return None
+
+            self.fills[sys_orderid] = (traded, avg_price)
+            self.fills.move_to_end(sys_orderid)
+            if len(self.fills) > self.size:
+                self.fills.popitem(last=False)
+
+        return volume, price
+    #------------------------------------------------------------------------------------------------- 
+    def seed(self, sys_orderid: str, traded: float, avg_price: float) -> None:
+        """
+        写入已知的累计成交，不产生成交推送
+        """
+        with self.lock:
+            last_traded, _ = self.fills.get(sys_orderid, (0, 0))
+            if traded > last_traded:
+                self.fills[sys_orderid] = (traded, avg_price)
 #------------------------------------------------------------------------------------------------- 
 class MexcTradeWebsocketApi(MexcWebsocketApiBase):
     """
@@ -1070,8 +3605,16 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
     def __init__(self, gateway: MexcGateway):
         """
         """
-        self.trade_count = 0
         super().__init__(gateway)
+
+        self.fill_tracker: MexcFillTracker = MexcFillTracker()
+
+        self.callbacks.update({
+            "push.personal.position": self.on_position,
+            "push.personal.order": self.on_order,
+            "push.personal.plan.order": self.on_plan_order,
+            "push.personal.stop.planorder": self.on_stop_plan_order,
+        })
     #------------------------------------------------------------------------------------------------- 
     def connect(
         self,
@@ -1115,45 +3658,34 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
         self.gateway.write_log(f"交易接口：{self.gateway_name}，交易Websocket API登录成功")
         self.subscribe_private()
     #------------------------------------------------------------------------------------------------- 
-    def on_packet(self, packet:Union[str,dict]) -> None:
+    def keep_channel(self, channel: str) -> bool:
+        """
+        私有频道报文全部解包，交给报文日志采样和缓存
+        """
+        return channel != "pong"
+    #------------------------------------------------------------------------------------------------- 
+    def on_packet(self, packet: Union[dict, None]) -> None:
         """
         """
-        if packet["channel"] == "pong":
+        if not packet:
             return
-        if packet["channel"] == "rs.login" and packet["data"] == "success":
-            self.on_login()
-        elif packet["channel"] == "rs.error":
-            self.on_error_msg(packet)
-        else:
-            self.on_data(packet)
-        ######在日志显示所有ws包
-        self.gateway.write_log(packet)
-        ########################
-    def on_data(self, data) -> None:
-        """
-        """
-        channel = data["channel"]
-        if channel == "push.personal.position":
-            self.on_position(data)
-        elif channel == "push.personal.order":
-            self.on_order(data)
-        elif channel == "push.personal.plan.order":
-            self.on_plan_order(data)
-        elif channel == "push.personal.stop.planorder":
-            self.on_stop_plan_order(data)
+        super().on_packet(packet)
+        self.gateway.packet_logger.log(packet)
     #------------------------------------------------------------------------------------------------- 
     def on_order(self, raw: dict) -> None:
         """
         收到委托回报
         """
         data=raw["data"]
-        
+        if self.gateway.hold_order_push(str(data["orderId"]), raw, self.on_order):
+            return
+
         if STATUS_MEXC2VT[data["state"]]==Status.ALLTRADED:
             price=float(data["dealAvgPrice"])
         else:
             price=float(data["price"])
         order_datetime = get_local_datetime(data["createTime"])
-        orderid = data["orderId"]
+        orderid = self.gateway.get_local_orderid(str(data["orderId"]))
         offset = self.gateway.get_order(orderid).offset if self.gateway.get_order(orderid) else None
         order = OrderData(
             symbol=data["symbol"],
@@ -1171,36 +3703,22 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
         )
         self.gateway.on_order(order)
 
-        # 将成交数量四舍五入到正确精度
-        trade_volume: float = float(data["dealVol"])
-        contract: ContractData = symbol_contract_map.get(order.symbol, None)
-        if contract:
-            trade_volume = round_to(trade_volume, contract.min_volume)
-        if not trade_volume:
-            return
-        
-        self.trade_count += 1
-
-        trade = TradeData(
-            symbol=order.symbol,
-            exchange=Exchange.MEXC,
-            orderid=order.orderid,
-            tradeid=str(self.trade_count),
-            direction=order.direction,
-            offset=offset,
-            price=float(data["dealAvgPrice"]),
-            volume=float(data["dealVol"]),
-            datetime= get_local_datetime(int(data["updateTime"])),
-            gateway_name=self.gateway_name,
+        self.update_fill(
+            order,
+            str(data["orderId"]),
+            float(data["dealVol"]),
+            float(data["dealAvgPrice"]),
+            int(data["updateTime"])
         )
-        self.gateway.on_trade(trade)
 
     def on_plan_order(self, raw: dict) -> None:
         """
         收到委托回报
         """
         data=raw["data"]
-        
+        if self.gateway.hold_order_push(str(data["id"]), raw, self.on_plan_order):
+            return
+
         if PLANSTATUS_MEXC2VT[data["state"]]==Status.ALLTRADED:
             traded=float(data["vol"])
             price=float(data["triggerPrice"])
@@ -1211,7 +3729,7 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
             traded=0
             price=float(data["triggerPrice"])
         order_datetime = get_local_datetime(data["createTime"])
-        orderid = data["id"]
+        orderid = self.gateway.get_local_orderid(str(data["id"]))
         offset = self.gateway.get_order(orderid).offset if self.gateway.get_order(orderid) else None
         order = OrderData(
             symbol=data["symbol"],
@@ -1229,29 +3747,13 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
         )
         self.gateway.on_order(order)
 
-        # 将成交数量四舍五入到正确精度
-        trade_volume: float = float(data["vol"])
-        contract: ContractData = symbol_contract_map.get(order.symbol, None)
-        if contract:
-            trade_volume = round_to(trade_volume, contract.min_volume)
-        if order.traded == 0:
-            return
-        
-        self.trade_count += 1
-
-        trade = TradeData(
-            symbol=order.symbol,
-            exchange=Exchange.MEXC,
-            orderid=order.orderid,
-            tradeid=str(self.trade_count),
-            direction=order.direction,
-            offset=order.offset,
-            price=float(data["triggerPrice"]),
-            volume=float(data["vol"]),
-            datetime= get_local_datetime(int(data["updateTime"])),
-            gateway_name=self.gateway_name,
+        self.update_fill(
+            order,
+            str(data["id"]),
+            traded,
+            price,
+            int(data["updateTime"])
         )
-        self.gateway.on_trade(trade)
 
     def on_stop_plan_order(self, raw: dict) -> None:
         """
@@ -1283,26 +3785,44 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
         )
         self.gateway.on_order(order)
 
+        self.update_fill(
+            order,
+            str(data["id"]),
+            traded,
+            price,
+            int(data["updateTime"])
+        )
+    #------------------------------------------------------------------------------------------------- 
+    def update_fill(
+        self,
+        order: OrderData,
+        sys_orderid: str,
+        traded: float,
+        avg_price: float,
+        update_time: int
+    ) -> None:
+        """
+        根据累计成交推送本次新增成交，成交号由交易所委托号和累计成交量组成
+        """
         # 将成交数量四舍五入到正确精度
-        trade_volume: float = float(data["vol"])
         contract: ContractData = symbol_contract_map.get(order.symbol, None)
-        if contract:
-            trade_volume = round_to(trade_volume, contract.min_volume)
-        if order.traded == 0:
+        min_volume = contract.min_volume if contract else 0
+
+        fill = self.fill_tracker.update(sys_orderid, traded, avg_price, min_volume)
+        if not fill:
             return
-        
-        self.trade_count += 1
+        volume, price = fill
 
         trade = TradeData(
             symbol=order.symbol,
             exchange=Exchange.MEXC,
             orderid=order.orderid,
-            tradeid=str(self.trade_count),
+            tradeid=f"{sys_orderid}-{traded!r}",
             direction=order.direction,
             offset=order.offset,
-            price=float(data["triggerPrice"]),
-            volume=float(data["vol"]),
-            datetime= get_local_datetime(int(data["updateTime"])),
+            price=price,
+            volume=volume,
+            datetime= get_local_datetime(update_time),
             gateway_name=self.gateway_name,
         )
         self.gateway.on_trade(trade)
@@ -1323,10 +3843,57 @@ class MexcTradeWebsocketApi(MexcWebsocketApiBase):
         )
         self.gateway.on_position(position)
 #------------------------------------------------------------------------------------------------- 
+def is_connect_error(e: Exception) -> bool:
+    """
+    请求是否在建立连接时失败，此时请求没有发出
+    """
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    if isinstance(e, requests.ConnectionError) and e.args:
+        return isinstance(getattr(e.args[0], "reason", None), NewConnectionError)
+    return False
+#------------------------------------------------------------------------------------------------- 
 def create_signature(secret:str,message:str):
     sign_str=hmac.new(bytes(secret, encoding="utf-8"),bytes(message, encoding="utf-8"), digestmod="sha256").hexdigest()
     return sign_str
 
+def load_record_file(path: Union[str, Path]) -> np.memmap:
+    """
+    只读映射行情记录文件，文件名后缀(_ticker/_depth)决定记录结构
+    """
+    path = Path(path)
+    kind = path.stem.rsplit("_", 1)[-1]
+    dtype = RECORD_DTYPE_MAP[kind]
+
+    count = int(np.fromfile(path, dtype=np.int64, count=1)[0])
+    return np.memmap(path, dtype=dtype, mode="r", offset=RECORD_HEADER_SIZE, shape=(count,))
+
+def get_request_group(path: str) -> Tuple[str, int]:
+    """
+    获取REST请求的限速分组和优先级
+    """
+    for prefix, group, priority in REQUEST_GROUPS:
+        if path.startswith(prefix):
+            return group, priority
+    return "market", PRIORITY_QUERY
+
+def get_window_interval(window: int) -> Union[Interval, None]:
+    """
+    将K线周期秒数转换为vnpy的Interval，只有1分钟、1小时、1天的周期有对应Interval，其他周期返回None
+    """
+    return WINDOW_INTERVAL_MAP.get(window, None)
+
+def get_packet_channel(text: str) -> str:
+    """
+    不解析json，直接从原始数据中读取channel字段
+    """
+    index = text.find('"channel"')
+    if index < 0:
+        return ""
+    start = text.find('"', index + 9) + 1
+    end = text.find('"', start)
+    return text[start:end]
+
 def get_local_datetime(timestamp: float) -> datetime:
     """生成时间"""
     dt: datetime = datetime.fromtimestamp(timestamp / 1000)